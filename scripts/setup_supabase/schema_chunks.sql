@@ -1,4 +1,4 @@
--- Enable the pgvector extension to work with embedding vectors
+-- Enable the pgvector extension to work with embedding vectors (halfvec: pgvector >= 0.7)
 CREATE EXTENSION IF NOT EXISTS vector;
 
 -- Create a table to store your documents
@@ -6,21 +6,36 @@ CREATE TABLE public.chunks (
     id bigserial PRIMARY KEY,
     content text, -- corresponds to Document.pageContent
     metadata jsonb, -- corresponds to Document.metadata
-    embedding vector(1024) -- 1024 works for bge-m3 embeddings
+    embedding halfvec(1024) -- 1024 works for bge-m3 embeddings; fp16 вдвое меньше vector
 );
 
 ALTER TABLE public.chunks OWNER TO postgres;
 
 -- Indexes for metadata queries
 CREATE INDEX idx_chunks_file_hash ON public.chunks USING btree (((metadata ->> 'file_hash'::text)));
-CREATE INDEX idx_chunks_file_path ON public.chunks USING btree (((metadata ->> 'file_path'::text)));
+-- Чанки документа по пути уже в порядке chunk_index: get_chunks_by_file_path
+-- читает индекс без сортировки; префикс file_path обслуживает и поиск/удаление по пути
+CREATE INDEX idx_chunks_file_path_chunk_index ON public.chunks USING btree (((metadata ->> 'file_path'::text)), (((metadata ->> 'chunk_index'::text))::integer));
+-- Фильтры structured search в chat_backend: category = %s, диапазон и сортировка по modified_at
+CREATE INDEX idx_chunks_category ON public.chunks USING btree (((metadata ->> 'category'::text)));
+CREATE INDEX idx_chunks_modified_at ON public.chunks USING btree (((metadata ->> 'modified_at'::text)) DESC NULLS LAST);
 
 -- Vector similarity search index (using HNSW for fast approximate nearest neighbor search)
-CREATE INDEX idx_chunks_embedding ON public.chunks USING hnsw (embedding vector_cosine_ops);
+CREATE INDEX idx_chunks_embedding ON public.chunks USING hnsw (embedding halfvec_cosine_ops);
+
+-- Кэш эмбеддингов по sha256(модель + текст чанка): при обновлении файла
+-- неизменённые чанки не отправляются в Ollama повторно
+CREATE TABLE IF NOT EXISTS public.embedding_cache (
+    content_sha256 bytea PRIMARY KEY,
+    embedding halfvec(1024) NOT NULL,
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+
+ALTER TABLE public.embedding_cache OWNER TO postgres;
 
 -- Create a function to search for documents
 CREATE FUNCTION match_chunks (
-    query_embedding vector(1024),
+    query_embedding halfvec(1024),
     match_count int DEFAULT NULL,
     filter jsonb DEFAULT '{}'
 ) RETURNS TABLE (
@@ -50,4 +65,5 @@ COMMENT ON TABLE public.chunks IS 'Хранит документы с векто
 COMMENT ON COLUMN public.chunks.content IS 'Текстовое содержимое чанка документа';
 COMMENT ON COLUMN public.chunks.metadata IS 'Метаданные: file_path, file_hash, chunk_index, timestamp и т.д.';
 COMMENT ON COLUMN public.chunks.embedding IS 'Векторное представление контента (1024 измерения для bge-m3)';
+COMMENT ON TABLE public.embedding_cache IS 'Кэш эмбеддингов чанков по хэшу содержимого';
 COMMENT ON FUNCTION match_chunks IS 'Поиск похожих документов по векторному представлению с фильтрацией по метаданным';
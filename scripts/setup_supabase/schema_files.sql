@@ -50,6 +50,9 @@ ALTER TABLE ONLY public.files
 CREATE INDEX idx_files_hash ON public.files USING btree (hash);
 CREATE INDEX idx_files_path ON public.files USING btree (path);
 CREATE INDEX idx_files_status_sync ON public.files USING btree (status_sync);
+-- Очередь FileWatcher (/api/next-file): только ожидающие обработки файлы
+CREATE INDEX idx_files_pending ON public.files USING btree (status_sync, last_checked)
+    WHERE status_sync IN ('added', 'updated', 'deleted');
 
 COMMENT ON TABLE public.files IS 'Отслеживает состояние файлов в monitored_folder';
 COMMENT ON COLUMN public.files.path IS 'Путь к файлу относительно monitored_folder';
@@ -16,8 +16,7 @@ from contextlib import contextmanager
 from typing import Dict, List, Optional, Any
 import os
 
-import psycopg2
-from psycopg2.pool import ThreadedConnectionPool
+from psycopg_pool import ConnectionPool
 
 
 class Database:
@@ -32,32 +31,32 @@ class Database:
         if not self._database_url:
             raise ValueError("DATABASE_URL не установлен")
         
-        # Пул соединений для многопоточности
-        self._pool: Optional[ThreadedConnectionPool] = None
+        # Пул соединений для многопоточности. psycopg 3 разбирает строки
+        # ответа в C-реализации (psycopg[binary]) и сам готовит запросы,
+        # повторяемые дашбордом (prepare_threshold)
+        self._pool: Optional[ConnectionPool] = None
     
-    def _get_pool(self) -> ThreadedConnectionPool:
+    def _get_pool(self) -> ConnectionPool:
         """Ленивая инициализация пула соединений."""
         if self._pool is None:
-            self._pool = ThreadedConnectionPool(
-                minconn=1,
-                maxconn=5,
-                dsn=self._database_url
+            self._pool = ConnectionPool(
+                self._database_url,
+                min_size=1,
+                max_size=5,
+                # Недоступная БД не должна подвешивать /health на 30 с по умолчанию
+                timeout=5.0,
+                open=True
             )
         return self._pool
 
     @contextmanager
     def get_connection(self):
-        """Контекстный менеджер для получения соединения из пула."""
-        pool = self._get_pool()
-        conn = pool.getconn()
-        try:
+        """Контекстный менеджер для получения соединения из пула.
+        
+        Пул psycopg 3 сам выполняет commit / rollback и возвращает соединение.
+        """
+        with self._get_pool().connection() as conn:
             yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
-        finally:
-            pool.putconn(conn)
     
     def get_file_state_stats(self) -> Dict[str, int]:
         """Получает статистику по файлам в таблице files
@@ -112,18 +111,17 @@ class Database:
             }
         """
         with self.get_connection() as conn:
-            with conn.cursor() as cur:
-                # Общее количество чанков
-                cur.execute("SELECT COUNT(*) FROM chunks")
-                total_chunks = cur.fetchone()[0]
-                
-                # Количество уникальных файлов
+            # Только целые: бинарный формат без разбора текста
+            with conn.cursor(binary=True) as cur:
+                # Общее количество чанков и уникальных файлов за один проход
+                # (COUNT DISTINCT сам пропускает NULL в file_hash)
                 cur.execute("""
-                    SELECT COUNT(DISTINCT metadata->>'file_hash') 
-                    FROM chunks 
-                    WHERE metadata->>'file_hash' IS NOT NULL
+                    SELECT 
+                        COUNT(*),
+                        COUNT(DISTINCT metadata->>'file_hash')
+                    FROM chunks
                 """)
-                unique_files = cur.fetchone()[0]
+                total_chunks, unique_files = cur.fetchone()
                 
                 # Средний размер
                 avg_chunks = round(total_chunks / unique_files, 2) if unique_files > 0 else 0
@@ -3,6 +3,7 @@ Backends API — информация о доступных бэкендах.
 """
 from fastapi import APIRouter
 
+from backends import BACKENDS
 from settings import settings
 
 router = APIRouter(prefix="/backends", tags=["Backends"])
@@ -11,7 +12,6 @@ router = APIRouter(prefix="/backends", tags=["Backends"])
 @router.get("")
 async def list_backends():
     """Список доступных бэкендов."""
-    from backends import BACKENDS
     return {
         "default": settings.CHAT_BACKEND,
         "available": list(BACKENDS.keys()),
@@ -14,6 +14,7 @@ from pydantic import BaseModel
 
 from logging_config import get_logger
 from backends import get_backend, get_default_backend, StreamEvent
+from repository import ChatRepository
 from settings import settings
 
 logger = get_logger("chat_backend.api.chat")
@@ -130,16 +131,26 @@ async def chat_stream(
 
 # === Stats ===
 
+# Репозиторий без состояния (соединения — в общем пуле db_pool):
+# один экземпляр на процесс вместо нового на каждый запрос /stats
+_stats_repository: Optional[ChatRepository] = None
+
+
+def _get_stats_repository() -> ChatRepository:
+    """Lazy singleton репозитория для /stats."""
+    global _stats_repository
+    if _stats_repository is None:
+        _stats_repository = ChatRepository(settings.DATABASE_URL)
+    return _stats_repository
+
+
 @router.get("/stats")
 async def stats():
     """Статистика базы знаний."""
     try:
-        from repository import ChatRepository
-        repository = ChatRepository(settings.DATABASE_URL)
-        return {
-            "total_chunks": repository.get_total_chunks_count(),
-            "unique_files": repository.get_unique_files_count(),
-        }
+        repository = _get_stats_repository()
+        # Один запрос вместо двух и вне event loop: psycopg2 блокирующий
+        return await asyncio.to_thread(repository.get_chunks_stats)
     except Exception as e:
         logger.error(f"Stats error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -19,30 +19,45 @@ Chat Backends Registry.
 3. Зарегистрировать в BACKENDS
 4. Добавить в docker-compose.yml
 """
-from typing import Dict, Type, Optional
+from importlib import import_module
+from typing import Dict, Tuple, Type, Optional
 
 from logging_config import get_logger
 from settings import settings
 
 from .protocol import ChatBackend, StreamEvent, SourceInfo
-from .simple import SimpleChatBackend
-from .agent import AgentChatBackend
-from .complex_agent import ComplexAgentBackend
-from .complex_phantom import ComplexPhantomBackend
 
 logger = get_logger("chat_backend.backends")
 
 
 # === Registry ===
 
-BACKENDS: Dict[str, Type[ChatBackend]] = {
-    "simple": SimpleChatBackend,
-    "agent": AgentChatBackend,
-    "complex_agent": ComplexAgentBackend,
-    "complex_phantom": ComplexPhantomBackend,
+# Имя бэкенда -> (подпакет, класс). Подпакеты импортируются лениво:
+# процесс загружает только выбранный бэкенд, а не все реализации
+# (complex_phantom — полная копия complex_agent) с их зависимостями
+BACKENDS: Dict[str, Tuple[str, str]] = {
+    "simple": ("simple", "SimpleChatBackend"),
+    "agent": ("agent", "AgentChatBackend"),
+    "complex_agent": ("complex_agent", "ComplexAgentBackend"),
+    "complex_phantom": ("complex_phantom", "ComplexPhantomBackend"),
 }
 
 
+def _load_backend_class(backend_name: str) -> Type[ChatBackend]:
+    """Импортировать подпакет бэкенда и вернуть его класс."""
+    module_name, class_name = BACKENDS[backend_name]
+    module = import_module(f".{module_name}", __name__)
+    return getattr(module, class_name)
+
+
+def __getattr__(name: str) -> Type[ChatBackend]:
+    """Ленивый доступ к классам бэкендов: from backends import SimpleChatBackend."""
+    for backend_name, (_, class_name) in BACKENDS.items():
+        if class_name == name:
+            return _load_backend_class(backend_name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def get_backend(backend_type: Optional[str] = None) -> ChatBackend:
     """
     Получить экземпляр бэкенда.
@@ -65,7 +80,7 @@ def get_backend(backend_type: Optional[str] = None) -> ChatBackend:
         backend_name = "simple"
     
     logger.info(f"Using chat backend: {backend_name}")
-    return BACKENDS[backend_name]()
+    return _load_backend_class(backend_name)()
 
 
 # Singleton instance (lazy)
@@ -56,7 +56,7 @@ def search_via_mcp(
                     "similarity": c.get("similarity", 0),
                 })
             
-            logger.debug(f"MCP search '{query[:30]}...' → {len(chunks)} chunks")
+            logger.debug("MCP search '%s...' → %s chunks", query[:30], len(chunks))
             return chunks
             
     except Exception as e:
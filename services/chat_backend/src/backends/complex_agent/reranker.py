@@ -83,7 +83,7 @@ def rerank_results(
     if top_k is not None:
         results = results[:top_k]
     
-    logger.debug(f"Reranked {len(hits)} hits → {len(results)} results")
+    logger.debug("Reranked %s hits → %s results", len(hits), len(results))
     return results
 
 
@@ -127,7 +127,7 @@ def _calculate_freshness(modified_at: Optional[str], now: datetime) -> float:
         return 1.0 - (age_days / MAX_DOCUMENT_AGE_DAYS)
         
     except (ValueError, TypeError) as e:
-        logger.debug(f"Failed to parse date '{modified_at}': {e}")
+        logger.debug("Failed to parse date '%s': %s", modified_at, e)
         return 0.0
 
 
@@ -162,7 +162,7 @@ def _search_iteration(
                 seen_chunks.add(key)
                 all_hits.append(hit)
         
-        logger.debug(f"Entity LIKE fallback: +{len(entity_like_hits)} hits for entity='{filters.entity}'")
+        logger.debug("Entity LIKE fallback: +%s hits for entity='%s'", len(entity_like_hits), filters.entity)
     
     # 4. Rerank
     results = rerank_results(all_hits, top_k=limit)
@@ -272,4 +272,4 @@ def _notify(callback: Optional[StreamCallback], message: str):
     """Отправить сообщение через callback если он есть."""
     if callback:
         callback(message)
-    logger.debug(f"Stream: {message}")
+    logger.debug("Stream: %s", message)
@@ -191,7 +191,7 @@ class RagAgent:
             parts.extend(filters.keywords[:3])  # Макс 3 keywords
         
         enriched = " ".join(parts)
-        logger.debug(f"Enriched query: {enriched}")
+        logger.debug("Enriched query: %s", enriched)
         return enriched
 
     def _extract_filters(self, query: str) -> ExtractedFilters:
@@ -259,7 +259,7 @@ class RagAgent:
             )
             
         except (json.JSONDecodeError, TypeError) as e:
-            logger.debug(f"Filter parse error: {e}")
+            logger.debug("Filter parse error: %s", e)
             return ExtractedFilters()
     
     def _generate_answer(self, query: str, results: List[SearchResult]) -> str:
@@ -115,8 +115,14 @@ class SearchFilter(BaseModel):
 
 # === Search Hit (промежуточный результат) ===
 
-class SearchHit(BaseModel):
-    """Результат поиска ДО реранкинга."""
+@dataclass(slots=True)
+class SearchHit:
+    """
+    Результат поиска ДО реранкинга.
+    
+    Внутренний тип (создаётся на каждую строку БД, наружу не сериализуется),
+    поэтому dataclass без валидации pydantic.
+    """
     content: str
     metadata: MetadataModel
     base_score: float = 0.0  # similarity от vector search или 0.5 для structured
@@ -11,6 +11,7 @@ from contextlib import contextmanager
 import psycopg2
 import psycopg2.extras
 
+from db_pool import pooled_connection, to_vector_literal
 from logging_config import get_logger
 from .schemas import SearchHit, SearchFilter, MetadataModel
 from .config import STRUCTURED_SEARCH_BASE_SCORE
@@ -39,17 +40,9 @@ class VectorStoreAdapter:
     
     @contextmanager
     def _get_connection(self):
-        """Context manager для соединения с БД."""
-        conn = psycopg2.connect(self.database_url)
-        try:
+        """Context manager для соединения с БД из общего пула."""
+        with pooled_connection(self.database_url) as conn:
             yield conn
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            logger.error(f"Database error: {e}")
-            raise
-        finally:
-            conn.close()
     
     def search_semantic(
         self,
@@ -74,7 +67,7 @@ class VectorStoreAdapter:
             logger.warning("Empty embedding for semantic search")
             return []
         
-        embedding_str = "[" + ",".join(map(str, embedding)) + "]"
+        embedding_str = to_vector_literal(embedding)
         
         # Строим WHERE условия и параметры для фильтров
         filter_clauses = []
@@ -101,11 +94,11 @@ class VectorStoreAdapter:
             SELECT 
                 content,
                 metadata,
-                1 - (embedding <=> %s::vector) as similarity
+                1 - (embedding <=> %s::halfvec) as similarity
             FROM {self.table_name}
             WHERE {where_sql}
-              AND 1 - (embedding <=> %s::vector) >= %s
-            ORDER BY embedding <=> %s::vector
+              AND 1 - (embedding <=> %s::halfvec) >= %s
+            ORDER BY embedding <=> %s::halfvec
             LIMIT %s
         """
         
@@ -122,7 +115,7 @@ class VectorStoreAdapter:
                             base_score=float(row["similarity"]),
                         ))
                     
-                    logger.debug(f"Semantic search: {len(results)} results | filters={filters}")
+                    logger.debug("Semantic search: %s results | filters=%s", len(results), filters)
                     return results
                     
         except Exception as e:
@@ -181,7 +174,7 @@ class VectorStoreAdapter:
                             base_score=STRUCTURED_SEARCH_BASE_SCORE,
                         ))
                     
-                    logger.debug(f"Structured search: {len(results)} results | filters={filters}")
+                    logger.debug("Structured search: %s results | filters=%s", len(results), filters)
                     return results
                     
         except Exception as e:
@@ -240,7 +233,7 @@ class VectorStoreAdapter:
                             base_score=STRUCTURED_SEARCH_BASE_SCORE,
                         ))
                     
-                    logger.debug(f"Entity LIKE search: {len(results)} results | entity={entity}")
+                    logger.debug("Entity LIKE search: %s results | entity=%s", len(results), entity)
                     return results
                     
         except Exception as e:
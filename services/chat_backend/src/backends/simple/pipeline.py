@@ -127,8 +127,7 @@ class SimpleRAGPipeline:
             ]
             
             logger.debug(
-                f"🔄 Reranked: {len(rerank_items)} → {len(chunks)} chunks | "
-                f"reranker={self.reranker.name}"
+                "🔄 Reranked: %s → %s chunks | reranker=%s", len(rerank_items), len(chunks), self.reranker.name
             )
         
         # 4. Форматируем контекст
@@ -149,7 +148,7 @@ class SimpleRAGPipeline:
         # 5. Формируем промпт
         prompt = self.CONTEXT_TEMPLATE.format(context=context_text, query=query)
         
-        logger.debug(f"Prepared context: {len(chunks)} chunks, {len(prompt)} chars")
+        logger.debug("Prepared context: %s chunks, %s chars", len(chunks), len(prompt))
         
         return RAGContext(
             chunks=chunks,
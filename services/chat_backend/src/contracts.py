@@ -35,6 +35,10 @@ class Repository(Protocol):
     def get_unique_files_count(self) -> int:
         """Получить количество уникальных файлов."""
         ...
+    
+    def get_chunks_stats(self) -> Dict[str, int]:
+        """Получить количество чанков и уникальных файлов одним запросом."""
+        ...
 
 
 __all__ = [
@@ -0,0 +1,69 @@
+"""
+Общий пул соединений PostgreSQL для Chat Backend и литералы pgvector.
+
+ChatRepository и VectorStoreAdapter бэкендов создаются в разных местах
+(эндпоинт /stats — на каждый запрос), поэтому пул один на процесс и DSN,
+а не на экземпляр репозитория.
+"""
+
+from __future__ import annotations
+import json
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, Iterator, List
+
+from psycopg2.extensions import connection
+from psycopg2.pool import ThreadedConnectionPool
+
+from logging_config import get_logger
+from settings import settings
+
+logger = get_logger("chat_backend.db_pool")
+
+_pools: Dict[str, ThreadedConnectionPool] = {}
+_pools_lock = Lock()
+
+_VECTOR_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+
+def to_vector_literal(embedding: List[float]) -> str:
+    """Текстовый литерал pgvector "[a,b,c]" для параметра %s::halfvec.
+    
+    Единственное место, где бэкенды превращают эмбеддинг запроса в строку.
+    """
+    return _VECTOR_ENCODER.encode(embedding)
+
+
+def get_pool(dsn: str) -> ThreadedConnectionPool:
+    """Ленивая инициализация пула для DSN (размер — DB_POOL_MAXCONN)."""
+    pool = _pools.get(dsn)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(dsn)
+            if pool is None:
+                pool = ThreadedConnectionPool(
+                    minconn=1,
+                    maxconn=settings.DB_POOL_MAXCONN,
+                    dsn=dsn,
+                )
+                _pools[dsn] = pool
+                logger.info(f"DB pool created | maxconn={settings.DB_POOL_MAXCONN}")
+    return pool
+
+
+@contextmanager
+def pooled_connection(dsn: str) -> Iterator[connection]:
+    """Context manager для соединения из общего пула: commit / rollback / возврат."""
+    pool = get_pool(dsn)
+    conn = pool.getconn()
+    try:
+        yield conn
+        conn.commit()
+    except Exception as exc:
+        if not conn.closed:
+            conn.rollback()
+        logger.error(f"Database error: {exc}")
+        raise
+    finally:
+        # Упавшее соединение закрываем, следующий getconn откроет новое
+        pool.putconn(conn, close=bool(conn.closed))
@@ -3,7 +3,6 @@
 """
 import logging
 import sys
-from pythonjsonlogger import jsonlogger
 
 
 _logging_configured = False
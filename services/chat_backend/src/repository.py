@@ -9,9 +9,9 @@ from __future__ import annotations
 from contextlib import contextmanager
 from typing import Dict, List, Any
 
-import psycopg2
 import psycopg2.extras
 
+from db_pool import pooled_connection, to_vector_literal
 from logging_config import get_logger
 
 logger = get_logger("chat_backend.repository")
@@ -20,6 +20,8 @@ logger = get_logger("chat_backend.repository")
 class ChatRepository:
     """PostgreSQL репозиторий для Chat Backend."""
     
+    __slots__ = ("connection_string", "chunks_table")
+    
     def __init__(
         self, 
         database_url: str,
@@ -30,17 +32,9 @@ class ChatRepository:
     
     @contextmanager
     def get_connection(self):
-        """Context manager для работы с соединением."""
-        conn = psycopg2.connect(self.connection_string)
-        try:
+        """Context manager для работы с соединением из общего пула."""
+        with pooled_connection(self.connection_string) as conn:
             yield conn
-            conn.commit()
-        except Exception as exc:
-            conn.rollback()
-            logger.error(f"Database error: {exc}")
-            raise
-        finally:
-            conn.close()
     
     def search_similar_chunks(
         self,
@@ -64,7 +58,7 @@ class ChatRepository:
             return []
         
         try:
-            embedding_str = "[" + ",".join(map(str, embedding)) + "]"
+            embedding_str = to_vector_literal(embedding)
             
             with self.get_connection() as conn:
                 with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
@@ -75,11 +69,11 @@ class ChatRepository:
                         SELECT 
                             content,
                             metadata,
-                            1 - (embedding <=> %s::vector) as similarity
+                            1 - (embedding <=> %s::halfvec) as similarity
                         FROM {self.chunks_table}
                         WHERE embedding IS NOT NULL
-                          AND 1 - (embedding <=> %s::vector) >= %s
-                        ORDER BY embedding <=> %s::vector
+                          AND 1 - (embedding <=> %s::halfvec) >= %s
+                        ORDER BY embedding <=> %s::halfvec
                         LIMIT %s
                         """,
                         (embedding_str, embedding_str, threshold, embedding_str, limit),
@@ -116,6 +110,24 @@ class ChatRepository:
                 )
                 return cur.fetchone()[0]
     
+    def get_chunks_stats(self) -> Dict[str, int]:
+        """
+        Количество чанков и уникальных файлов одним запросом.
+        
+        Returns:
+            {"total_chunks": ..., "unique_files": ...}
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    SELECT COUNT(*), COUNT(DISTINCT metadata->>'file_hash')
+                    FROM {self.chunks_table}
+                    """
+                )
+                total_chunks, unique_files = cur.fetchone()
+                return {"total_chunks": total_chunks, "unique_files": unique_files}
+    
     def get_chunks_by_file_path(self, file_path: str) -> List[Dict[str, Any]]:
         """
         Получить все чанки документа по пути к файлу.
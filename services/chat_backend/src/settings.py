@@ -30,6 +30,8 @@ class Settings(BaseSettings):
     
     # Database (PostgreSQL + pgvector)
     DATABASE_URL: str
+    # Максимум соединений общего пула (с запасом до max_connections PostgreSQL)
+    DB_POOL_MAXCONN: int
     
     # Ollama
     OLLAMA_BASE_URL: str
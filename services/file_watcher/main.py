@@ -135,7 +135,7 @@ def main():
         
         # Ждем следующую итерацию
         if not shutdown_requested:
-            logger.debug(f"💤 Sleeping for {settings.SCAN_INTERVAL_SECONDS}s...")
+            logger.debug("💤 Sleeping for %ss...", settings.SCAN_INTERVAL_SECONDS)
             time.sleep(settings.SCAN_INTERVAL_SECONDS)
     
     logger.info("=" * 60)
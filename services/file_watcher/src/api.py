@@ -4,11 +4,13 @@
 Изолированный сервис — не зависит от core/.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.responses import Response
-from typing import Optional, Dict
+from typing import Callable, List, Optional, Dict, TypeVar
 from pydantic import BaseModel, Field
+import asyncio
 import os
+import time
 
 from repository import FileWatcherRepository
 
@@ -22,6 +24,11 @@ app = FastAPI(
 # Инициализация репозитория
 db = FileWatcherRepository(database_url=os.getenv("DATABASE_URL"))
 
+# Пауза между проверками очереди, пока long-poll /api/next-file ждёт файл
+NEXT_FILE_POLL_INTERVAL = 0.5
+
+T = TypeVar("T")
+
 
 class FileResponse(BaseModel):
     """Модель файла для обработки"""
@@ -39,8 +46,24 @@ async def health():
     return {"status": "healthy", "service": "file-watcher-api", "version": "2.0.0"}
 
 
+async def _long_poll(fetch: Callable[[], T], wait: float) -> T:
+    """Повторяет fetch, пока он возвращает пустой результат, но не дольше wait секунд.
+    
+    Запрос к БД блокирующий: выполняется вне event loop, чтобы ожидающие
+    long-poll запросы не останавливали остальные.
+    """
+    deadline = time.monotonic() + wait
+    result = await asyncio.to_thread(fetch)
+    while not result and time.monotonic() < deadline:
+        await asyncio.sleep(NEXT_FILE_POLL_INTERVAL)
+        result = await asyncio.to_thread(fetch)
+    return result
+
+
 @app.get("/api/next-file", response_model=Optional[FileResponse])
-async def get_next_file():
+async def get_next_file(
+    wait: float = Query(0, ge=0, le=60, description="Long-poll: сколько секунд ждать файл")
+):
     """Получить следующий файл для обработки
     
     Приоритет обработки:
@@ -50,12 +73,16 @@ async def get_next_file():
     
     Файл атомарно помечается как 'processed' для предотвращения дублирования.
     
+    При wait > 0 пустая очередь не отвечает сразу: запрос ждёт до wait
+    секунд, пока файл не появится (long-poll), и worker получает его без
+    задержки на интервал своего опроса.
+    
     Returns:
         FileResponse: Информация о следующем файле для обработки
-        204 No Content: Если очередь пуста
+        204 No Content: Если очередь пуста (в течение wait секунд)
     """
     try:
-        next_file = db.get_next_file()
+        next_file = await _long_poll(db.get_next_file, wait)
         
         if next_file is None:
             return Response(status_code=204)
@@ -66,6 +93,32 @@ async def get_next_file():
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
+@app.get("/api/next-files", response_model=List[FileResponse])
+async def get_next_files(
+    count: int = Query(1, ge=1, le=100, description="Сколько файлов вернуть"),
+    wait: float = Query(0, ge=0, le=60, description="Long-poll: сколько секунд ждать файл")
+):
+    """Получить до count следующих файлов одним запросом
+    
+    Порядок и long-poll — как у /api/next-file. Worker заполняет все
+    свободные слоты одним запросом вместо запроса на каждый файл.
+    
+    Returns:
+        List[FileResponse]: Файлы для обработки
+        204 No Content: Если очередь пуста (в течение wait секунд)
+    """
+    try:
+        next_files = await _long_poll(lambda: db.get_next_files(count), wait)
+        
+        if not next_files:
+            return Response(status_code=204)
+        
+        return [item.as_dict() for item in next_files]
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
 @app.get("/api/queue/stats")
 async def get_queue_stats() -> Dict[str, int]:
     """Получить статистику очереди обработки
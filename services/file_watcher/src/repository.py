@@ -4,23 +4,27 @@
 Изолированная реализация работы с БД без зависимости от core/.
 Содержит только методы, необходимые для FileWatcher:
 - sync_by_hash() — синхронизация файлов с диска
-- get_next_file() — получение следующего файла из очереди
+- get_next_file() / get_next_files() — получение файлов из очереди
 - get_queue_stats() — статистика очереди
-- get_file_state_records() — список файлов для VectorSync
-- get_documents_records() — список чанков для VectorSync
+- iter_file_state_records() — файлы для VectorSync (серверный курсор)
+- iter_documents_records() — чанки для VectorSync (серверный курсор)
 - update_status_sync_batch() — пакетное обновление статусов
 """
 
 from __future__ import annotations
 
 import os
+import time
 from contextlib import contextmanager
+from threading import Lock
+from weakref import WeakKeyDictionary
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, List, Any, Optional, Iterable
+from typing import Dict, List, Any, Optional, Iterable, Iterator
 
 import psycopg2
 import psycopg2.extras
+from psycopg2.pool import ThreadedConnectionPool
 
 import logging
 logger = logging.getLogger(__name__)
@@ -36,7 +40,7 @@ class FileStatus(str, Enum):
     ERROR = "error"
 
 
-@dataclass
+@dataclass(slots=True)
 class FileQueueItem:
     """Файл из очереди на обработку."""
     path: str
@@ -60,35 +64,133 @@ class FileQueueItem:
 class FileWatcherRepository:
     """PostgreSQL репозиторий для FileWatcher (изолированный от core/)."""
 
+    # Строк за один сетевой round-trip серверных курсоров синхронизации
+    SYNC_FETCH_SIZE = 500
+    # Секунд, в течение которых get_queue_stats отдаёт закэшированный ответ:
+    # UI опрашивает /api/queue/stats чаще, чем меняется очередь
+    QUEUE_STATS_TTL = 2.0
+
     def __init__(
         self,
         database_url: Optional[str] = None,
         files_table: str = "files",
         chunks_table: str = "chunks",
+        pool_maxconn: int = 5,
     ):
         self.connection_string = database_url or os.getenv("DATABASE_URL")
         self.files_table = files_table
         self.chunks_table = chunks_table
+        self.pool_maxconn = pool_maxconn
+
+        # Пул соединений: цикл сканирования и запросы API /api/next-file
+        # переиспользуют соединения вместо нового подключения на каждый вызов
+        self._pool: Optional[ThreadedConnectionPool] = None
+        self._pool_lock = Lock()
+
+        # Запросы API, которые worker'ы ingest дёргают на каждый файл:
+        # PREPARE один раз на соединение пула, дальше только EXECUTE
+        self._statements: Dict[str, str] = {
+            # Выборка и пометка 'processed' одним запросом: SKIP LOCKED не
+            # даёт двум worker'ам получить один файл, RETURNING отдаёт
+            # статус до пометки — по нему worker выбирает действие
+            "fw_next_files": f"""
+                WITH next AS (
+                    SELECT id, status_sync
+                    FROM {self.files_table}
+                    WHERE status_sync IN ('deleted', 'updated', 'added')
+                    ORDER BY
+                        CASE status_sync
+                            WHEN 'deleted' THEN 1
+                            WHEN 'updated' THEN 2
+                            ELSE 3
+                        END,
+                        last_checked
+                    LIMIT $1
+                    FOR UPDATE SKIP LOCKED
+                ), claimed AS (
+                    UPDATE {self.files_table} AS f
+                    SET status_sync = 'processed'
+                    FROM next
+                    WHERE f.id = next.id
+                    RETURNING f.path, f.hash, f.size, f.mtime, next.status_sync, f.last_checked
+                )
+                SELECT * FROM claimed
+                ORDER BY
+                    CASE status_sync
+                        WHEN 'deleted' THEN 1
+                        WHEN 'updated' THEN 2
+                        ELSE 3
+                    END,
+                    last_checked
+            """,
+            "fw_queue_stats": f"""
+                SELECT status_sync, COUNT(*)
+                FROM {self.files_table}
+                GROUP BY status_sync
+            """,
+        }
+        # Подготовленные запросы каждого соединения; закрытое соединение
+        # уходит из словаря вместе со своими PREPARE
+        self._prepared: WeakKeyDictionary = WeakKeyDictionary()
+        # (момент истечения по time.monotonic(), статистика очереди)
+        self._queue_stats_cache: Optional[tuple[float, Dict[str, int]]] = None
         self._ensure_tables()
 
+    def _get_pool(self) -> ThreadedConnectionPool:
+        """Ленивая инициализация пула соединений."""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadedConnectionPool(
+                        minconn=1,
+                        maxconn=self.pool_maxconn,
+                        dsn=self.connection_string,
+                    )
+        return self._pool
+
     @contextmanager
     def get_connection(self):
-        """Context manager для работы с БД."""
-        conn = psycopg2.connect(self.connection_string)
+        """Context manager для работы с соединением из пула."""
+        pool = self._get_pool()
+        conn = pool.getconn()
         try:
             yield conn
             conn.commit()
         except Exception as exc:
-            conn.rollback()
+            if not conn.closed:
+                conn.rollback()
             logger.error(f"Database error: {exc}")
             raise
         finally:
-            conn.close()
+            # Разорванное соединение не возвращаем в пул
+            pool.putconn(conn, close=bool(conn.closed))
+
+    def _execute_prepared(self, conn, cur, name: str, params: tuple = ()) -> None:
+        """Выполняет запрос из self._statements через EXECUTE (PREPARE при первом вызове)."""
+        prepared = self._prepared.setdefault(conn, set())
+        if name not in prepared:
+            cur.execute(f"PREPARE {name} AS {self._statements[name]}")
+            prepared.add(name)
+        if params:
+            placeholders = ", ".join(["%s"] * len(params))
+            cur.execute(f"EXECUTE {name}({placeholders})", params)
+        else:
+            cur.execute(f"EXECUTE {name}")
 
     def _ensure_tables(self) -> None:
         """Создаёт таблицы и индексы если не существуют."""
         with self.get_connection() as conn:
             with conn.cursor() as cur:
+                # Статус — ENUM, как в scripts/setup_supabase/schema_files.sql:
+                # 4 байта вместо строки в каждой строке таблицы и ключе индекса
+                cur.execute("""
+                    DO $$ BEGIN
+                        CREATE TYPE status_sync AS ENUM (
+                            'ok', 'added', 'deleted', 'updated', 'processed', 'error'
+                        );
+                    EXCEPTION WHEN duplicate_object THEN NULL;
+                    END $$
+                """)
                 cur.execute(f"""
                     CREATE TABLE IF NOT EXISTS {self.files_table} (
                         id SERIAL PRIMARY KEY,
@@ -96,7 +198,7 @@ class FileWatcherRepository:
                         size BIGINT NOT NULL,
                         hash TEXT,
                         mtime DOUBLE PRECISION,
-                        status_sync TEXT DEFAULT 'ok',
+                        status_sync status_sync DEFAULT 'ok',
                         last_checked TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         raw_text TEXT
                     )
@@ -104,6 +206,12 @@ class FileWatcherRepository:
                 cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.files_table}_path ON {self.files_table}(path)")
                 cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.files_table}_hash ON {self.files_table}(hash)")
                 cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.files_table}_status_sync ON {self.files_table}(status_sync)")
+                # Очередь /api/next-file: в индексе только ожидающие обработки файлы
+                cur.execute(f"""
+                    CREATE INDEX IF NOT EXISTS idx_{self.files_table}_pending
+                    ON {self.files_table}(status_sync, last_checked)
+                    WHERE status_sync IN ('added', 'updated', 'deleted')
+                """)
 
     # -------------------------------------------------------------------------
     # Синхронизация файловой системы
@@ -121,10 +229,14 @@ class FileWatcherRepository:
         stats = {"added": 0, "updated": 0, "unchanged": 0, "deleted": 0}
 
         with self.get_connection() as conn:
+            # Текущее состояние БД: path -> (hash, status). Серверный курсор
+            # отдаёт строки пачками, без полного списка кортежей в памяти
+            with conn.cursor(name="sync_files") as read_cur:
+                read_cur.itersize = self.SYNC_FETCH_SIZE
+                read_cur.execute(f"SELECT path, hash, status_sync FROM {self.files_table}")
+                db_records = {path: (file_hash, status) for path, file_hash, status in read_cur}
+
             with conn.cursor() as cur:
-                # Получаем текущее состояние БД
-                cur.execute(f"SELECT path, hash, status_sync FROM {self.files_table}")
-                db_records = {row[0]: {"hash": row[1], "status": row[2]} for row in cur.fetchall()}
                 disk_paths = {f["path"]: f for f in disk_files}
 
                 inserts: List[tuple] = []
@@ -143,9 +255,9 @@ class FileWatcherRepository:
                         stats["added"] += 1
                         continue
 
-                    db_record = db_records[disk_path]
-                    hash_matches = db_record["hash"] == disk_file["hash"]
-                    action, new_status = self._decide_action(db_record["status"], hash_matches)
+                    db_hash, db_status = db_records[disk_path]
+                    hash_matches = db_hash == disk_file["hash"]
+                    action, new_status = self._decide_action(db_status, hash_matches)
 
                     if action == "skip":
                         stats["unchanged"] += 1
@@ -177,23 +289,20 @@ class FileWatcherRepository:
 
                 # Batch update статусов
                 if status_updates:
-                    cur.executemany(
-                        f"""
-                        UPDATE {self.files_table}
-                        SET status_sync = %s, last_checked = CURRENT_TIMESTAMP
-                        WHERE path = %s
-                        """,
+                    self._update_by_path(
+                        cur,
+                        "status_sync = v.status_sync::status_sync, last_checked = CURRENT_TIMESTAMP",
+                        "status_sync, path",
                         status_updates,
                     )
 
                 # Batch update с полными данными
                 if full_updates:
-                    cur.executemany(
-                        f"""
-                        UPDATE {self.files_table}
-                        SET hash = %s, size = %s, mtime = %s, status_sync = %s, last_checked = CURRENT_TIMESTAMP
-                        WHERE path = %s
-                        """,
+                    self._update_by_path(
+                        cur,
+                        "hash = v.hash, size = v.size, mtime = v.mtime, "
+                        "status_sync = v.status_sync::status_sync, last_checked = CURRENT_TIMESTAMP",
+                        "hash, size, mtime, status_sync, path",
                         full_updates,
                     )
 
@@ -202,7 +311,7 @@ class FileWatcherRepository:
                 if missing_paths:
                     paths_to_delete = [
                         path for path in missing_paths
-                        if db_records[path]["status"] != FileStatus.DELETED.value
+                        if db_records[path][1] != FileStatus.DELETED.value
                     ]
                     if paths_to_delete:
                         cur.execute(
@@ -215,8 +324,37 @@ class FileWatcherRepository:
                         )
                         stats["deleted"] = cur.rowcount
 
+        self._invalidate_queue_stats()
         return stats
 
+    def _update_by_path(self, cur, assignments: str, columns: str, rows: List[tuple]) -> int:
+        """UPDATE ... FROM (VALUES ...) по path: один запрос на страницу строк.
+        
+        executemany отправлял отдельный UPDATE на каждую строку.
+        
+        Args:
+            assignments: SET-часть, значения берутся из v.<колонка>
+            columns: Имена колонок VALUES, последняя — path
+            rows: Кортежи значений в порядке columns
+            
+        Returns:
+            Количество обновлённых записей
+        """
+        updated = psycopg2.extras.execute_values(
+            cur,
+            f"""
+            UPDATE {self.files_table} AS f
+            SET {assignments}
+            FROM (VALUES %s) AS v({columns})
+            WHERE f.path = v.path
+            RETURNING 1
+            """,
+            rows,
+            page_size=500,
+            fetch=True,
+        )
+        return len(updated)
+
     def _decide_action(self, current_status: Optional[str], hash_matches: bool) -> tuple[str, Optional[str]]:
         """Определяет действие для существующего файла."""
         if hash_matches:
@@ -245,30 +383,29 @@ class FileWatcherRepository:
         
         Приоритет: deleted > updated > added
         
-        ВАЖНО: Этот метод НЕ меняет статус файла!
-        Worker должен сам пометить файл как 'processed' после получения.
+        Файл сразу помечается как 'processed' (см. get_next_files).
         
         Returns:
             FileQueueItem или None если очередь пуста
         """
+        files = self.get_next_files(1)
+        return files[0] if files else None
+
+    def get_next_files(self, limit: int) -> List[FileQueueItem]:
+        """Получает до limit следующих файлов для обработки (порядок как у get_next_file).
+        
+        Файлы помечаются как 'processed' тем же запросом, что их выбирает:
+        параллельные запросы не получат одни и те же файлы. В status_sync
+        возвращается статус до пометки.
+        
+        Returns:
+            Список FileQueueItem (пустой если очередь пуста)
+        """
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(f"""
-                    SELECT path, hash, size, mtime, status_sync, last_checked
-                    FROM {self.files_table}
-                    WHERE status_sync IN ('deleted', 'updated', 'added')
-                    ORDER BY
-                        CASE status_sync
-                            WHEN 'deleted' THEN 1
-                            WHEN 'updated' THEN 2
-                            ELSE 3
-                        END,
-                        last_checked
-                    LIMIT 1
-                """)
-                row = cur.fetchone()
-                if row:
-                    return FileQueueItem(
+                self._execute_prepared(conn, cur, "fw_next_files", (limit,))
+                files = [
+                    FileQueueItem(
                         path=row[0],
                         hash=row[1],
                         size=row[2],
@@ -276,44 +413,70 @@ class FileWatcherRepository:
                         status_sync=row[4],
                         last_checked=row[5],
                     )
-                return None
+                    for row in cur.fetchall()
+                ]
+        if files:
+            self._invalidate_queue_stats()
+        return files
 
     def get_queue_stats(self) -> Dict[str, int]:
-        """Возвращает статистику очереди по статусам."""
+        """Возвращает статистику очереди по статусам.
+        
+        Ответ кэшируется на QUEUE_STATS_TTL секунд; изменения статусов из
+        FileWatcher сбрасывают кэш, изменения из ingest видны по истечении TTL.
+        """
+        cached = self._queue_stats_cache
+        if cached is not None and cached[0] > time.monotonic():
+            return dict(cached[1])
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(f"""
-                    SELECT status_sync, COUNT(*)
-                    FROM {self.files_table}
-                    GROUP BY status_sync
-                """)
-                return {row[0] or "unknown": row[1] for row in cur.fetchall()}
+                self._execute_prepared(conn, cur, "fw_queue_stats")
+                stats = {row[0] or "unknown": row[1] for row in cur.fetchall()}
+        self._queue_stats_cache = (time.monotonic() + self.QUEUE_STATS_TTL, stats)
+        return dict(stats)
+
+    def _invalidate_queue_stats(self) -> None:
+        """Сбрасывает кэш get_queue_stats после изменения статусов."""
+        self._queue_stats_cache = None
 
     # -------------------------------------------------------------------------
     # VectorSync методы
     # -------------------------------------------------------------------------
 
-    def get_file_state_records(self) -> List[tuple]:
-        """Возвращает все записи из таблицы files для VectorSync."""
-        with self.get_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(f"SELECT path, hash, status_sync FROM {self.files_table}")
-                return cur.fetchall()
+    def _iter_rows(self, cursor_name: str, query: str) -> Iterator[tuple]:
+        """Построчно отдаёт результат запроса через серверный курсор.
 
-    def get_documents_records(self) -> List[tuple]:
-        """Возвращает уникальные файлы из таблицы chunks для VectorSync."""
+        Строки подтягиваются пачками по SYNC_FETCH_SIZE, поэтому в памяти
+        не держится вся таблица целиком. Итератор нужно дочитать до конца:
+        соединение возвращается в пул только после последней строки.
+        """
         with self.get_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(f"""
-                    SELECT metadata->>'file_hash' as hash,
-                           metadata->>'file_path' as path,
-                           COUNT(*)
-                    FROM {self.chunks_table}
-                    WHERE metadata->>'file_hash' IS NOT NULL
-                      AND metadata->>'file_path' IS NOT NULL
-                    GROUP BY metadata->>'file_hash', metadata->>'file_path'
-                """)
-                return cur.fetchall()
+            with conn.cursor(name=cursor_name) as cur:
+                cur.itersize = self.SYNC_FETCH_SIZE
+                cur.execute(query)
+                yield from cur
+
+    def iter_file_state_records(self) -> Iterator[tuple]:
+        """Построчно отдаёт (path, hash, status_sync) из таблицы files для VectorSync."""
+        return self._iter_rows(
+            "file_state_records",
+            f"SELECT path, hash, status_sync FROM {self.files_table}",
+        )
+
+    def iter_documents_records(self) -> Iterator[tuple]:
+        """Построчно отдаёт уникальные (hash, path, count) из таблицы chunks для VectorSync."""
+        return self._iter_rows(
+            "documents_records",
+            f"""
+                SELECT metadata->>'file_hash' as hash,
+                       metadata->>'file_path' as path,
+                       COUNT(*)
+                FROM {self.chunks_table}
+                WHERE metadata->>'file_hash' IS NOT NULL
+                  AND metadata->>'file_path' IS NOT NULL
+                GROUP BY metadata->>'file_hash', metadata->>'file_path'
+            """,
+        )
 
     def update_status_sync_batch(self, updates: Iterable[tuple[str, str]]) -> int:
         """Пакетное обновление статусов.
@@ -329,11 +492,11 @@ class FileWatcherRepository:
             return 0
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.executemany(
-                    f"UPDATE {self.files_table} SET status_sync = %s WHERE path = %s",
-                    updates,
+                updated = self._update_by_path(
+                    cur, "status_sync = v.status_sync::status_sync", "status_sync, path", updates
                 )
-                return cur.rowcount
+        self._invalidate_queue_stats()
+        return updated
 
     def reset_processed_to_added(self) -> int:
         """Сбрасывает зависшие 'processed' статусы в 'added'.
@@ -350,7 +513,9 @@ class FileWatcherRepository:
                     SET status_sync = 'added', last_checked = CURRENT_TIMESTAMP
                     WHERE status_sync = 'processed'
                 """)
-                return cur.rowcount
+                reset = cur.rowcount
+        self._invalidate_queue_stats()
+        return reset
 
 
 __all__ = ["FileWatcherRepository", "FileStatus", "FileQueueItem"]
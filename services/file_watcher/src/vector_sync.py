@@ -54,24 +54,20 @@ class VectorSync:
             'unchanged': 0
         }
         
-        # 1. Получаем все файлы из file_state
-        file_state_records = self.db.get_file_state_records()
-        
-        # 2. Получаем все уникальные файлы из documents
-        documents_records = self.db.get_documents_records()
-        
-        # Создаём словари для быстрого поиска
-        # file_state: path -> (hash, current_status)
+        # 1. Все файлы из file_state: path -> (hash, current_status).
+        # Строки приходят пачками с серверного курсора, промежуточный список не строим
         file_state_map = {
             row[0]: {'hash': row[1], 'status': row[2]} 
-            for row in file_state_records
+            for row in self.db.iter_file_state_records()
         }
         
-        # documents: path -> hash
-        documents_map = {row[1]: row[0] for row in documents_records}
-        
-        # documents: hash -> path (для обратного поиска)
-        documents_hash_map = {row[0]: row[1] for row in documents_records}
+        # 2. Все уникальные файлы из documents за один проход:
+        # path -> hash и hash -> path (для обратного поиска)
+        documents_map = {}
+        documents_hash_map = {}
+        for doc_hash, doc_path, _ in self.db.iter_documents_records():
+            documents_map[doc_path] = doc_hash
+            documents_hash_map[doc_hash] = doc_path
         
         # 3. Определяем новый статус для каждого файла в file_state
         updates = []  # [(new_status, file_path), ...]
@@ -65,21 +65,26 @@ class TestSyncLogic:
     
     def _insert_record(self, path: str, file_hash: str, status: str, size: int = 100):
         """Вставляет запись в БД с заданным статусом"""
+        self._insert_records([(path, file_hash, status, size)])
+    
+    def _insert_records(self, rows: list):
+        """Вставляет записи (path, hash, status, size) одним запросом на одном соединении
+        
+        status=None передаётся как NULL.
+        """
+        import psycopg2.extras
+        
+        values = [
+            (path, size, file_hash, 1234567890.0, status)
+            for path, file_hash, status, size in rows
+        ]
         with self.db.get_connection() as conn:
             with conn.cursor() as cur:
-                if status is None:
-                    # NULL статус
-                    cur.execute(f"""
-                        INSERT INTO {self.db.table_name} 
-                        (file_path, file_size, file_hash, file_mtime, status_sync)
-                        VALUES (%s, %s, %s, %s, NULL)
-                    """, (path, size, file_hash, 1234567890.0))
-                else:
-                    cur.execute(f"""
-                        INSERT INTO {self.db.table_name} 
-                        (file_path, file_size, file_hash, file_mtime, status_sync)
-                        VALUES (%s, %s, %s, %s, %s)
-                    """, (path, size, file_hash, 1234567890.0, status))
+                psycopg2.extras.execute_values(cur, f"""
+                    INSERT INTO {self.db.table_name} 
+                    (file_path, file_size, file_hash, file_mtime, status_sync)
+                    VALUES %s
+                """, values)
     
     def _get_status(self, path: str) -> str:
         """Получает текущий статус файла из БД"""
@@ -120,11 +125,13 @@ class TestSyncLogic:
         
         statuses = ['added', 'updated', 'processed', 'deleted', 'ok', 'error', None]
         
+        rows = []
         for status in statuses:
             status_str = 'NULL' if status is None else status
             filename = f'del_{status_str}.txt'
             
-            self._insert_record(filename, 'hash_' + status_str, status)
+            rows.append((filename, 'hash_' + status_str, status, 100))
+        self._insert_records(rows)
             
         # Синхронизируем с пустым диском
         stats = self.db.sync_by_hash([])
@@ -181,6 +188,7 @@ class TestSyncLogic:
         ]
         
         disk_files = []
+        rows = []
         
         for initial_status, expected_status in test_cases:
             status_str = 'NULL' if initial_status is None else initial_status
@@ -191,7 +199,8 @@ class TestSyncLogic:
             disk_files.append(file_meta)
             
             # Вставляем с тем же хэшем
-            self._insert_record(file_meta['path'], file_meta['hash'], initial_status, file_meta['size'])
+            rows.append((file_meta['path'], file_meta['hash'], initial_status, file_meta['size']))
+        self._insert_records(rows)
         
         # Синхронизируем
         stats = self.db.sync_by_hash(disk_files)
@@ -237,6 +246,7 @@ class TestSyncLogic:
         
         statuses = ['added', 'updated', 'processed', 'deleted', 'ok', 'error', None]
         disk_files = []
+        rows = []
         
         for status in statuses:
             status_str = 'NULL' if status is None else status
@@ -247,7 +257,8 @@ class TestSyncLogic:
             disk_files.append(file_meta)
             
             # Вставляем с ДРУГИМ хэшем
-            self._insert_record(file_meta['path'], 'old_hash_' + status_str, status, file_meta['size'])
+            rows.append((file_meta['path'], 'old_hash_' + status_str, status, file_meta['size']))
+        self._insert_records(rows)
         
         # Синхронизируем
         stats = self.db.sync_by_hash(disk_files)
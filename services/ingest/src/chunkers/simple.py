@@ -2,6 +2,7 @@
 Простой чанкер: разбивает текст на части фиксированного размера.
 """
 
+import re
 from typing import List
 
 from logging_config import get_logger
@@ -10,6 +11,11 @@ from settings import settings
 
 logger = get_logger("ingest.chunker.simple")
 
+# Абзац — строки, разделённые одиночным \n; пустая строка (\n\n) его
+# завершает. Те же абзацы, что split('\n\n') после strip(), но без списка
+# всех абзацев документа в памяти
+_PARAGRAPH_RE = re.compile(r"[^\n]+(?:\n(?!\n)[^\n]+)*")
+
 
 def simple_chunker(file: FileSnapshot) -> List[str]:
     """
@@ -35,43 +41,44 @@ def simple_chunker(file: FileSnapshot) -> List[str]:
     chunk_size = settings.CHUNK_SIZE
     chunks = []
     
-    # Разбиваем по абзацам
-    paragraphs = text.split('\n\n')
-    current_chunk = ""
+    # Разбиваем по абзацам (лениво, по мере сборки чанков)
+    paragraphs = (match.group() for match in _PARAGRAPH_RE.finditer(text))
+    # Части текущего чанка и длина их склейки через "\n\n": чанк собирается
+    # одним join, а не += на каждый абзац с копированием всего чанка
+    buf: List[str] = []
+    buf_len = 0
     
     for para in paragraphs:
         para = para.strip()
         if not para:
             continue
         
-        if len(current_chunk) + len(para) + 2 <= chunk_size:
-            if current_chunk:
-                current_chunk += "\n\n" + para
-            else:
-                current_chunk = para
+        if buf_len + len(para) + 2 <= chunk_size:
+            buf_len += len(para) + 2 if buf else len(para)
+            buf.append(para)
         else:
-            if current_chunk:
-                chunks.append(current_chunk)
+            if buf:
+                chunks.append("\n\n".join(buf))
             
             # Если абзац больше chunk_size, разбиваем его
             if len(para) > chunk_size:
-                words = para.split()
-                current_chunk = ""
-                for word in words:
-                    if len(current_chunk) + len(word) + 1 <= chunk_size:
-                        if current_chunk:
-                            current_chunk += " " + word
-                        else:
-                            current_chunk = word
+                words: List[str] = []
+                words_len = 0
+                for word in para.split():
+                    if words_len + len(word) + 1 <= chunk_size:
+                        words_len += len(word) + 1 if words else len(word)
+                        words.append(word)
                     else:
-                        if current_chunk:
-                            chunks.append(current_chunk)
-                        current_chunk = word
+                        if words:
+                            chunks.append(" ".join(words))
+                        words, words_len = [word], len(word)
+                # Хвост абзаца продолжает текущий чанк
+                buf, buf_len = [" ".join(words)], words_len
             else:
-                current_chunk = para
+                buf, buf_len = [para], len(para)
     
-    if current_chunk:
-        chunks.append(current_chunk)
+    if buf:
+        chunks.append("\n\n".join(buf))
     
     logger.info(f"Simple chunking | chunks={len(chunks)}")
     return chunks
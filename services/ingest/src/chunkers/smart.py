@@ -2,7 +2,9 @@
 Smart чанкер с LangChain RecursiveCharacterTextSplitter.
 """
 
-from typing import List
+import re
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, List, Optional
 
 from logging_config import get_logger
 from contracts import FileSnapshot
@@ -10,8 +12,55 @@ from settings import settings
 
 logger = get_logger("ingest.chunker.smart")
 
+# Границы предложений и абзацев для fallback-разбиения без LangChain
+_BOUNDARY_RE = re.compile(r'[.!?]\s+|\n\n')
 
-def smart_chunker(file: FileSnapshot) -> List[str]:
+
+def _boundary_offsets(text: str) -> List[int]:
+    """Отсортированные позиции сразу после границ предложений/абзацев."""
+    return [m.end() for m in _BOUNDARY_RE.finditer(text)]
+
+
+def _split_by_boundaries(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """
+    Разбиение с overlap по заранее найденным границам.
+    
+    Текст сканируется регуляркой один раз; конец чанка и начало перекрытия
+    находятся бинарным поиском по массиву границ, без повторного
+    разбора хвоста предыдущего чанка.
+    """
+    offsets = _boundary_offsets(text)
+    text_len = len(text)
+    chunks = []
+    start = 0
+    
+    while start < text_len:
+        limit = start + chunk_size
+        if limit >= text_len:
+            end = text_len
+        else:
+            # Последняя граница не дальше limit, иначе режем по размеру
+            idx = bisect_right(offsets, limit) - 1
+            end = offsets[idx] if idx >= 0 and offsets[idx] > start else limit
+        
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= text_len:
+            break
+        
+        # Отступаем на overlap и выравниваем на ближайшую границу внутри чанка
+        idx = bisect_left(offsets, end - chunk_overlap)
+        next_start = offsets[idx] if idx < len(offsets) and offsets[idx] < end else end
+        start = next_start if next_start > start else end
+    
+    return chunks
+
+
+def smart_chunker(
+    file: FileSnapshot,
+    splitter_factory: Optional[Callable[..., Any]] = None,
+) -> List[str]:
     """
     Smart чанкер с LangChain RecursiveCharacterTextSplitter.
     
@@ -22,6 +71,7 @@ def smart_chunker(file: FileSnapshot) -> List[str]:
     
     Args:
         file: FileSnapshot с заполненным raw_text
+        splitter_factory: Фабрика сплиттера (по умолчанию RecursiveCharacterTextSplitter)
         
     Returns:
         Список чанков
@@ -32,12 +82,17 @@ def smart_chunker(file: FileSnapshot) -> List[str]:
         logger.warning(f"Empty text for chunking")
         return []
     
+    chunk_size = settings.CHUNK_SIZE
+    chunk_overlap = settings.CHUNK_OVERLAP
+    
     try:
-        from langchain_text_splitters import RecursiveCharacterTextSplitter
+        if splitter_factory is None:
+            from langchain_text_splitters import RecursiveCharacterTextSplitter
+            splitter_factory = RecursiveCharacterTextSplitter
         
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=settings.CHUNK_SIZE,
-            chunk_overlap=settings.CHUNK_OVERLAP,
+        splitter = splitter_factory(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
             separators=["\n\n", "\n", ". ", " ", ""],
             length_function=len,
         )
@@ -47,13 +102,14 @@ def smart_chunker(file: FileSnapshot) -> List[str]:
         # Фильтруем пустые чанки
         chunks = [c.strip() for c in chunks if c.strip()]
         
-        logger.info(f"Smart chunking | chunks={len(chunks)} overlap={settings.CHUNK_OVERLAP}")
+        logger.info(f"Smart chunking | chunks={len(chunks)} overlap={chunk_overlap}")
         return chunks
         
     except ImportError:
-        logger.warning("LangChain not available, falling back to simple chunker")
-        from .simple import simple_chunker
-        return simple_chunker(file)
+        logger.warning("LangChain not available, falling back to boundary splitter")
+        chunks = _split_by_boundaries(text, chunk_size, chunk_overlap)
+        logger.info(f"Smart chunking | chunks={len(chunks)} overlap={chunk_overlap}")
+        return chunks
     except Exception as e:
         logger.error(f"Smart chunking failed | error={e}")
         from .simple import simple_chunker
@@ -59,6 +59,6 @@ def letterhead_cleaner(text: str) -> str:
     reduction = ((original_len - cleaned_len) / original_len * 100) if original_len > 0 else 0
     
     if reduction > 1:  # Логируем только если убрали больше 1%
-        logger.debug(f"Letterhead cleaner | {original_len} → {cleaned_len} chars ({reduction:.1f}% reduced)")
+        logger.debug("Letterhead cleaner | %s → %s chars (%.1f%% reduced)", original_len, cleaned_len, reduction)
     
     return text
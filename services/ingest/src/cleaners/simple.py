@@ -7,6 +7,17 @@ from logging_config import get_logger
 
 logger = get_logger("ingest.cleaner.simple")
 
+# Таблица для str.translate: управляющие символы (кроме \n, \t, \r) удаляются,
+# Unicode-пробелы заменяются обычным пробелом — один проход вместо двух regex
+_CONTROL_CHARS = [*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20), 0x7f]
+_UNICODE_SPACES = [0x00a0, *range(0x2000, 0x200c), 0x202f, 0x205f, 0x3000]
+_TRANSLATE_TABLE = {
+    **{code: None for code in _CONTROL_CHARS},
+    **{code: ' ' for code in _UNICODE_SPACES},
+}
+
+_MULTI_SPACE_RE = re.compile(r' +')
+
 
 def simple_cleaner(text: str) -> str:
     """
@@ -17,27 +28,32 @@ def simple_cleaner(text: str) -> str:
     
     original_len = len(text)
     
-    # 1. Удаляем управляющие символы (кроме \n и \t)
-    text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', text)
-    
-    # 2. Нормализуем Unicode пробелы
-    text = re.sub(r'[\u00a0\u2000-\u200b\u202f\u205f\u3000]', ' ', text)
-    
-    # 3. Удаляем множественные пробелы
-    text = re.sub(r' +', ' ', text)
-    
-    # 4. Удаляем пробелы в начале/конце строк
-    text = '\n'.join(line.strip() for line in text.split('\n'))
-    
-    # 5. Удаляем множественные переносы строк (больше 2)
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    
-    # 6. Финальный strip
-    text = text.strip()
+    # 1. Удаляем управляющие символы и нормализуем Unicode пробелы
+    text = text.translate(_TRANSLATE_TABLE)
+    
+    # 2. Удаляем множественные пробелы
+    text = _MULTI_SPACE_RE.sub(' ', text)
+    
+    # 3. За один проход по строкам: strip каждой строки и схлопывание
+    #    подряд идущих пустых строк (эквивалент \n{3,} → \n\n)
+    lines = []
+    prev_empty = False
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            if prev_empty:
+                continue
+            prev_empty = True
+        else:
+            prev_empty = False
+        lines.append(line)
+    
+    # 4. Финальный strip
+    text = '\n'.join(lines).strip()
     
     cleaned_len = len(text)
     reduction = ((original_len - cleaned_len) / original_len * 100) if original_len > 0 else 0
     
-    logger.debug(f"Simple cleaner | {original_len} → {cleaned_len} chars ({reduction:.1f}% reduced)")
+    logger.debug("Simple cleaner | %s → %s chars (%.1f%% reduced)", original_len, cleaned_len, reduction)
     
     return text
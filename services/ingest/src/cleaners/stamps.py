@@ -44,6 +44,6 @@ def stamps_cleaner(text: str) -> str:
     reduction = ((original_len - cleaned_len) / original_len * 100) if original_len > 0 else 0
     
     if reduction > 0:
-        logger.debug(f"Stamps cleaner | {original_len} → {cleaned_len} chars ({reduction:.1f}% reduced)")
+        logger.debug("Stamps cleaner | %s → %s chars (%.1f%% reduced)", original_len, cleaned_len, reduction)
     
     return text
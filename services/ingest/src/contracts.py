@@ -7,13 +7,13 @@
 
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Callable, Protocol, List, Optional, Dict, Any, runtime_checkable
+from typing import Callable, ContextManager, Protocol, List, Optional, Dict, Any, Sequence, Tuple, runtime_checkable
 from enum import Enum
 
 
-@dataclass
+@dataclass(slots=True)
 class FileSnapshot:
-    """Снимок файла для обработки."""
+    """Снимок файла для обработки (slots: без __dict__ на каждый файл)."""
     
     hash: str
     path: str
@@ -75,10 +75,22 @@ class Repository(Protocol):
         """Пометить файл как находящийся в обработке."""
         ...
     
+    def mark_many_as(self, status: SyncStatus, file_hashes: Sequence[str]) -> int:
+        """Пометить пачку файлов одним запросом, вернуть число обновлённых."""
+        ...
+    
     def delete_chunks_by_hash(self, file_hash: str) -> int:
         """Удалить все чанки файла по хэшу."""
         ...
     
+    def delete_chunks_for_file(self, file_hash: str, file_path: str) -> Tuple[int, int]:
+        """Удалить чанки файла по хэшу и по пути за один запрос: (по хэшу, устаревшие)."""
+        ...
+    
+    def delete_file_and_chunks(self, file_hash: str, file_path: str) -> Tuple[int, int]:
+        """Удалить чанки и запись о файле одним запросом: (по хэшу, устаревшие)."""
+        ...
+    
     def delete_file_by_hash(self, file_hash: str) -> bool:
         """Удалить запись о файле по хэшу."""
         ...
@@ -92,9 +104,41 @@ class Repository(Protocol):
         """Сохранить чанк с метаданными и эмбеддингом."""
         ...
     
+    def save_chunks(
+        self,
+        rows: List[Tuple[str, Dict[str, Any], List[float]]],
+        shared_metadata: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """
+        Сохранить пачку чанков (content, metadata, embedding) одним COPY.
+        
+        shared_metadata — метаданные, общие для всех строк пачки.
+        """
+        ...
+    
+    def get_cached_embeddings(self, keys: List[bytes]) -> Dict[bytes, List[float]]:
+        """Эмбеддинги из кэша по sha256-ключам содержимого (только найденные)."""
+        ...
+    
+    def save_cached_embeddings(self, items: List[Tuple[bytes, List[float]]]) -> int:
+        """Сохранить эмбеддинги (ключ, вектор) в кэш."""
+        ...
+    
     def set_raw_text(self, file_hash: str, raw_text: str) -> bool:
         """Сохранить raw_text файла."""
         ...
+    
+    def replace_raw_text(self, file_hash: str, raw_text: str) -> bool:
+        """Сохранить raw_text файла; False — текст совпал с прежним."""
+        ...
+    
+    def retag_chunks(self, file_hash: str, file_path: str, doc_metadata: Dict[str, Any]) -> int:
+        """Перепривязать полный набор чанков файла по пути к новому хэшу и метаданным."""
+        ...
+    
+    def session(self, commit_every: int = 100) -> ContextManager[None]:
+        """Одно соединение и COMMIT раз в commit_every операций в текущем потоке."""
+        ...
 
 
 class ParserRegistry:
@@ -2,8 +2,13 @@
 Ollama embedder: создание векторных представлений через Ollama API.
 """
 
-from typing import List, Dict, Any
+import contextvars
+import hashlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 
 from logging_config import get_logger
 from contracts import FileSnapshot, Repository
@@ -14,6 +19,48 @@ logger = get_logger("ingest.embedder.ollama")
 # Размер батча для Ollama API
 BATCH_SIZE = 50
 
+# Батчей одного файла, одновременно отправленных в Ollama: сервер считает
+# следующий батч, пока клиент принимает ответ и готовит строки предыдущего
+EMBED_CONCURRENCY = 2
+
+# Одновременных запросов к Ollama: потоки эмбеддинга × батчи в полёте
+MAX_INFLIGHT_REQUESTS = settings.WORKER_MAX_CONCURRENT_EMBEDDING * EMBED_CONCURRENCY
+
+# Keep-alive сессия: TCP-соединение к Ollama переиспользуется между батчами
+# и потоками эмбеддинга вместо нового handshake на каждый запрос. По
+# соединению на каждый одновременный запрос: сверх pool_maxsize соединение
+# закрывается после ответа, и следующий батч снова открывает новое
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_INFLIGHT_REQUESTS))
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_INFLIGHT_REQUESTS))
+
+# Сервер без батчевого /api/embed (старая Ollama): после первого отказа
+# батчи сразу идут в /api/embeddings, без лишнего запроса с 404 на каждый
+_embed_supported = True
+
+
+def _get_embeddings_legacy(texts: List[str]) -> List[List[float]]:
+    """
+    Эмбеддинги через старый endpoint /api/embeddings (по одному тексту).
+    
+    Fallback для версий Ollama без батчевого /api/embed.
+    """
+    embeddings = []
+    for text in texts:
+        response = _session.post(
+            f"{settings.OLLAMA_BASE_URL}/api/embeddings",
+            json={
+                "model": settings.OLLAMA_EMBEDDING_MODEL,
+                "prompt": text
+            },
+            timeout=120
+        )
+        if response.status_code != 200:
+            logger.error(f"Ollama legacy embedding error | status={response.status_code}")
+            return []
+        embeddings.append(response.json()['embedding'])
+    return embeddings
+
 
 def _get_embeddings_batch(texts: List[str]) -> List[List[float]]:
     """
@@ -25,8 +72,12 @@ def _get_embeddings_batch(texts: List[str]) -> List[List[float]]:
     Returns:
         Список векторов или пустой список при ошибке
     """
+    global _embed_supported
     try:
-        response = requests.post(
+        if not _embed_supported:
+            return _get_embeddings_legacy(texts)
+        
+        response = _session.post(
             f"{settings.OLLAMA_BASE_URL}/api/embed",
             json={
                 "model": settings.OLLAMA_EMBEDDING_MODEL,
@@ -35,11 +86,22 @@ def _get_embeddings_batch(texts: List[str]) -> List[List[float]]:
             timeout=120
         )
         
+        if response.status_code == 404:
+            logger.warning("Ollama /api/embed not found, falling back to /api/embeddings")
+            _embed_supported = False
+            return _get_embeddings_legacy(texts)
+        
         if response.status_code != 200:
             logger.error(f"Ollama embedding error | status={response.status_code}")
             return []
         
-        embeddings = response.json().get('embeddings', [])
+        data = response.json()
+        if 'embeddings' not in data:
+            logger.warning("Ollama response without 'embeddings', falling back to /api/embeddings")
+            _embed_supported = False
+            return _get_embeddings_legacy(texts)
+        
+        embeddings = data['embeddings']
         
         if len(embeddings) != len(texts):
             logger.error(f"Ollama returned {len(embeddings)} embeddings for {len(texts)} texts")
@@ -52,6 +114,94 @@ def _get_embeddings_batch(texts: List[str]) -> List[List[float]]:
         return []
 
 
+def _cache_key(text: str) -> bytes:
+    """Ключ кэша эмбеддингов: sha256 от модели и текста (смена модели — новый ключ)."""
+    return hashlib.sha256(f"{settings.OLLAMA_EMBEDDING_MODEL}\0{text}".encode("utf-8")).digest()
+
+
+def _get_embeddings_cached(
+    repo: Repository,
+    texts: List[str]
+) -> Tuple[List[List[float]], List[Tuple[bytes, List[float]]]]:
+    """
+    Эмбеддинги батча с кэшем по содержимому: в Ollama уходят только промахи.
+    
+    Ошибки кэша не мешают эмбеддингу — батч просто считается целиком.
+    Новые векторы не пишутся в кэш здесь: их сохраняет фоновая запись
+    батча вместе с чанками, пока Ollama считает следующий батч.
+    
+    Returns:
+        (векторы, новые элементы кэша); векторы пусты при ошибке Ollama
+    """
+    keys = [_cache_key(text) for text in texts]
+    try:
+        cached = repo.get_cached_embeddings(keys)
+    except Exception as e:
+        logger.warning(f"Embedding cache lookup failed: {e}")
+        cached = {}
+    
+    # Промахи без дублей: одинаковые чанки считаются один раз
+    missing: Dict[bytes, str] = {}
+    for key, text in zip(keys, texts):
+        if key not in cached:
+            missing.setdefault(key, text)
+    
+    new_items: List[Tuple[bytes, List[float]]] = []
+    if missing:
+        fresh = _get_embeddings_batch(list(missing.values()))
+        if not fresh:
+            return [], []
+        
+        new_items = list(zip(missing.keys(), fresh))
+        cached.update(new_items)
+    
+    hits = sum(1 for key in keys if key not in missing)
+    if hits:
+        logger.debug("Embedding cache | hits=%s/%s", hits, len(texts))
+    
+    return [cached[key] for key in keys], new_items
+
+
+def _save_batch(
+    repo: Repository,
+    cache_items: List[Tuple[bytes, List[float]]],
+    rows: List[Tuple[str, Dict[str, Any], List[float]]],
+    shared_metadata: Dict[str, Any],
+    old_file: Optional[FileSnapshot] = None
+) -> int:
+    """
+    Фоновая запись батча: новые эмбеддинги в кэш, затем чанки (COPY).
+    
+    Все записи идут через одно соединение сессии и фиксируются одним COMMIT.
+    С old_file перед COPY удаляются прежние чанки файла (по хэшу и по пути):
+    замена видна поиску целиком, без промежутка, когда чанков у файла нет.
+    """
+    with repo.session():
+        if cache_items:
+            try:
+                repo.save_cached_embeddings(cache_items)
+            except Exception as e:
+                # Ошибка уже откатила транзакцию сессии — до неё в ней ничего нет
+                logger.warning(f"Embedding cache save failed: {e}")
+        if old_file is not None:
+            by_hash, stale = repo.delete_chunks_for_file(old_file.hash, old_file.path)
+            if by_hash + stale > 0:
+                logger.info(f"Deleted old chunks | count={by_hash + stale} stale={stale}")
+        return repo.save_chunks(rows, shared_metadata=shared_metadata)
+
+
+def _wait_saved(pending: Optional[Tuple[Future, int, int]]) -> int:
+    """Дождаться записи предыдущего батча; при ошибке батч пропускается."""
+    if pending is None:
+        return 0
+    future, batch_start, batch_end = pending
+    try:
+        return future.result()
+    except Exception as e:
+        logger.error(f"Error saving chunks {batch_start}-{batch_end}: {e}")
+        return 0
+
+
 def ollama_embedder(
     repo: Repository,
     file: FileSnapshot,
@@ -80,45 +230,70 @@ def ollama_embedder(
         
         logger.info(f"Embedding | chunks={len(chunks)}")
         
-        # Удаляем старые чанки
-        deleted_count = repo.delete_chunks_by_hash(file.hash)
-        if deleted_count > 0:
-            logger.info(f"Deleted old chunks | count={deleted_count}")
-        
         inserted_count = 0
         total_chunks = len(chunks)
+        # Метаданные документа и файла одинаковы для всех чанков: репозиторий
+        # кодирует их в JSON один раз на батч, у чанка — только chunk_index
+        shared_metadata = {
+            **doc_metadata,
+            'file_hash': file.hash,
+            'file_path': file.path,
+            'total_chunks': total_chunks
+        }
         
-        # Обрабатываем чанки батчами
-        for batch_start in range(0, total_chunks, BATCH_SIZE):
+        def submit_embedding(batch_start: int) -> Tuple[Future, int, int]:
             batch_end = min(batch_start + BATCH_SIZE, total_chunks)
-            batch_chunks = chunks[batch_start:batch_end]
-            
-            # Получаем эмбеддинги для батча
-            embeddings = _get_embeddings_batch(batch_chunks)
-            
-            if not embeddings:
-                logger.error(f"Failed to get embeddings for batch {batch_start}-{batch_end}")
-                continue
-            
-            # Сохраняем каждый чанк
-            for idx, (chunk_text, embedding) in enumerate(zip(batch_chunks, embeddings)):
-                try:
-                    global_idx = batch_start + idx
-                    # Объединяем метаданные документа с метаданными чанка
-                    metadata = {
-                        **doc_metadata,
-                        'file_hash': file.hash,
-                        'file_path': file.path,
-                        'chunk_index': global_idx,
-                        'total_chunks': total_chunks
-                    }
-                    
-                    repo.save_chunk(chunk_text, metadata, embedding)
-                    inserted_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error saving chunk {global_idx}: {e}")
+            context = contextvars.copy_context()
+            future = embed_pool.submit(
+                context.run, _get_embeddings_cached, repo, chunks[batch_start:batch_end]
+            )
+            return future, batch_start, batch_end
+        
+        # Обрабатываем чанки батчами: до EMBED_CONCURRENCY батчей считаются в
+        # Ollama параллельно, результаты забираются по порядку. Запись батча
+        # в БД идёт в отдельном потоке; в полёте не больше одной записи,
+        # поэтому в памяти не более EMBED_CONCURRENCY + 2 батчей
+        pending: Optional[Tuple[Future, int, int]] = None
+        batch_starts = iter(range(0, total_chunks, BATCH_SIZE))
+        with ThreadPoolExecutor(max_workers=EMBED_CONCURRENCY, thread_name_prefix="embed") as embed_pool, \
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix="chunk-writer") as writer:
+            in_flight = deque(
+                submit_embedding(batch_start)
+                for _, batch_start in zip(range(EMBED_CONCURRENCY), batch_starts)
+            )
+            while in_flight:
+                future, batch_start, batch_end = in_flight.popleft()
+                next_start = next(batch_starts, None)
+                if next_start is not None:
+                    in_flight.append(submit_embedding(next_start))
+                batch_chunks = chunks[batch_start:batch_end]
+                
+                # Эмбеддинги батча (неизменённые чанки — из кэша)
+                embeddings, cache_items = future.result()
+                
+                if not embeddings:
+                    logger.error(f"Failed to get embeddings for batch {batch_start}-{batch_end}")
                     continue
+                
+                rows = [
+                    (chunk_text, {'chunk_index': batch_start + idx}, embedding)
+                    for idx, (chunk_text, embedding) in enumerate(zip(batch_chunks, embeddings))
+                ]
+                
+                # Кэш и чанки батча пишутся в фоне (маркер файла — через контекст).
+                # Старые чанки удаляются в транзакции первого записанного батча
+                inserted_count += _wait_saved(pending)
+                old_file = file if inserted_count == 0 else None
+                context = contextvars.copy_context()
+                pending = (
+                    writer.submit(
+                        context.run, _save_batch, repo, cache_items, rows, shared_metadata, old_file
+                    ),
+                    batch_start,
+                    batch_end,
+                )
+            
+            inserted_count += _wait_saved(pending)
         
         logger.info(f"Embedded | count={inserted_count}/{total_chunks}")
         return inserted_count
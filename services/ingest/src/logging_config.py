@@ -23,6 +23,11 @@ FILE_MARKERS = [
     "🐱", "🐶", "🐸", "🦊", "🐼", "🐨", "🦁", "🐯", "🐻", "🐰",
 ]
 
+# Библиотеки, которые пишут DEBUG/INFO на каждый HTTP-запрос или страницу
+# документа. Уровень WARNING на самом логгере отсекает запись в
+# isEnabledFor(), до создания LogRecord и форматирования маркером
+NOISY_LOGGERS = ("urllib3", "httpx", "httpcore", "pdfminer", "PIL")
+
 
 def set_file_marker(marker: Optional[str] = None) -> str:
     """
@@ -80,6 +85,10 @@ def setup_logging(level: str = "INFO") -> None:
         datefmt='%Y-%m-%d %H:%M:%S'
     ))
     root_logger.addHandler(handler)
+    
+    # Тишина для шумных библиотек (их предупреждения и ошибки остаются)
+    for name in NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -9,6 +9,8 @@ Ingest Service - точка входа.
 - Эмбеддинг через Ollama и сохранение в pgvector
 """
 
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from threading import Semaphore
 
 from settings import settings
@@ -21,6 +23,7 @@ from parsers import build_parser_registry
 from cleaners import build_cleaner
 from chunkers import build_chunker
 from embedders import build_embedder
+from embedders.ollama import EMBED_CONCURRENCY
 from metaextractors import build_metaextractor
 from pipeline import IngestDocument, ProcessFileEvent
 
@@ -38,10 +41,15 @@ def main():
     
     # 2. Инициализация репозитория
     logger.info("Initializing repository...")
+    # Пул по числу одновременных соединений: на каждый файл EMBED_CONCURRENCY
+    # потоков эмбеддинга (поиск в кэше) и поток записи чанков (пока они
+    # работают, поток пайплайна ждёт и соединения не держит), плюс цикл
+    # worker'а. ThreadedConnectionPool не ждёт свободного соединения, а падает
     repository = IngestRepository(
         database_url=settings.DATABASE_URL,
         files_table="files",
-        chunks_table="chunks"
+        chunks_table="chunks",
+        pool_maxconn=settings.WORKER_MAX_CONCURRENT_FILES * (EMBED_CONCURRENCY + 1) + 1
     )
     
     # Сброс зависших processed статусов
@@ -52,9 +60,6 @@ def main():
     # 3. Сборка компонентов пайплайна
     logger.info("Building pipeline components...")
     
-    parser_registry = build_parser_registry()
-    logger.info(f"Parsers: {parser_registry.supported_extensions()}")
-    
     cleaner = build_cleaner()
     chunker = build_chunker()
     embedder = build_embedder()
@@ -65,12 +70,26 @@ def main():
     embed_semaphore = Semaphore(settings.WORKER_MAX_CONCURRENT_EMBEDDING)
     llm_semaphore = Semaphore(settings.WORKER_MAX_CONCURRENT_LLM)
     
+    # Пул процессов для парсинга (spawn: без fork многопоточного процесса)
+    parse_executor = None
+    if settings.WORKER_PARSE_PROCESSES > 0:
+        parse_executor = ProcessPoolExecutor(
+            max_workers=settings.WORKER_PARSE_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info(f"Parse processes: {settings.WORKER_PARSE_PROCESSES}")
+    
+    # Запись отладочных .md в фоне, вне критического пути файла
+    save_executor = None
+    if settings.KEEP_PARSED_MD:
+        save_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="save-md")
+    
     # 4. Сборка пайплайна
     logger.info("Assembling pipeline...")
     
     ingest_document = IngestDocument(
         repository=repository,
-        parser_registry=parser_registry,
+        parser_registry_factory=build_parser_registry,
         chunker=chunker,
         embedder=embedder,
         parse_semaphore=parse_semaphore,
@@ -78,9 +97,14 @@ def main():
         llm_semaphore=llm_semaphore,
         cleaner=cleaner,
         metaextractor=metaextractor,
+        parse_executor=parse_executor,
         temp_dir=settings.TMP_MD_PATH,
+        keep_parsed_md=settings.KEEP_PARSED_MD,
+        save_executor=save_executor,
     )
     
+    logger.info(f"Parsers: {ingest_document.parser_registry.supported_extensions()}")
+    
     process_file_event = ProcessFileEvent(
         ingest_document=ingest_document,
         repository=repository,
@@ -99,16 +123,40 @@ def main():
     logger.info("✅ Ingest Service ready")
     logger.info(f"  FileWatcher: {settings.FILEWATCHER_URL}")
     logger.info(f"  Ollama: {settings.OLLAMA_BASE_URL}")
+    logger.info(f"  Concurrent files: {settings.WORKER_MAX_CONCURRENT_FILES}")
     logger.info(f"  Cleaner pipeline: {settings.CLEANER_PIPELINE}")
     logger.info(f"  Chunker: {settings.CHUNKER_BACKEND} (size={settings.CHUNK_SIZE}, overlap={settings.CHUNK_OVERLAP})")
     logger.info(f"  MetaExtractor pipeline: {settings.METAEXTRACTOR_PIPELINE}")
     logger.info("=" * 60)
     
-    # 6. Запуск worker
-    worker.start(
-        poll_interval=settings.WORKER_POLL_INTERVAL,
-        max_workers=settings.WORKER_MAX_CONCURRENT_FILES,
-    )
+    try:
+        # 6. Первичная загрузка в пустую таблицу: HNSW-индекс не обновляется
+        #    на каждый INSERT, а строится один раз после разбора очереди
+        if repository.is_chunks_empty():
+            logger.info("📦 Empty chunks table, initial bulk load")
+            with repository.bulk_load():
+                worker.start(
+                    poll_interval=settings.WORKER_POLL_INTERVAL,
+                    max_workers=settings.WORKER_MAX_CONCURRENT_FILES,
+                    stop_when_idle=True,
+                )
+        elif repository.ensure_embedding_index():
+            # Прошлая первичная загрузка прервана (SIGTERM, SIGKILL, OOM)
+            # до перестроения индекса — без него поиск идёт полным сканом
+            logger.warning("⚠️ Embedding index was missing and has been rebuilt")
+        
+        # 7. Запуск worker
+        worker.start(
+            poll_interval=settings.WORKER_POLL_INTERVAL,
+            max_workers=settings.WORKER_MAX_CONCURRENT_FILES,
+        )
+    finally:
+        # Процессы парсинга останавливаются вместе с сервисом, недописанные
+        # отладочные .md дописываются
+        if parse_executor is not None:
+            parse_executor.shutdown(cancel_futures=True)
+        if save_executor is not None:
+            save_executor.shutdown()
 
 
 if __name__ == "__main__":
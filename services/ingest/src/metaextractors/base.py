@@ -48,6 +48,6 @@ def base_extractor(file: FileSnapshot, metadata: Dict[str, Any]) -> Dict[str, An
     if modified_at:
         result["modified_at"] = modified_at
     
-    logger.debug(f"Base extraction | file={file.path} ext={ext} mtime={modified_at}")
+    logger.debug("Base extraction | file=%s ext=%s mtime=%s", file.path, ext, modified_at)
     
     return result
@@ -15,6 +15,7 @@ import json
 import re
 from typing import Dict, Any, List
 import requests
+from requests.adapters import HTTPAdapter
 
 from logging_config import get_logger
 from contracts import FileSnapshot
@@ -22,6 +23,12 @@ from settings import settings
 
 logger = get_logger("ingest.metaextractor.llm")
 
+# Keep-alive сессия к Ollama: запрос на каждый файл из потоков worker'а
+# переиспользует TCP-соединения пула вместо нового handshake
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
+
 
 # Категории документов
 DOCUMENT_CATEGORIES = [
@@ -91,7 +98,7 @@ def llm_extractor(file: FileSnapshot, metadata: Dict[str, Any]) -> Dict[str, Any
     )
 
     try:
-        response = requests.post(
+        response = _session.post(
             f"{settings.OLLAMA_BASE_URL}/api/generate",
             json={
                 "model": settings.OLLAMA_LLM_MODEL,
@@ -191,7 +198,7 @@ def _parse_llm_response(response: str) -> Dict[str, Any]:
         return result
         
     except json.JSONDecodeError as e:
-        logger.debug(f"JSON parse error: {e}")
+        logger.debug("JSON parse error: %s", e)
         return {}
 
 
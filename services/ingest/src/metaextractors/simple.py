@@ -34,6 +34,6 @@ def simple_extractor(file: FileSnapshot, metadata: Dict[str, Any]) -> Dict[str,
     result = metadata.copy()
     result["extension"] = ext
     
-    logger.debug(f"Simple extraction | file={file.path} ext={ext}")
+    logger.debug("Simple extraction | file=%s ext=%s", file.path, ext)
     
     return result
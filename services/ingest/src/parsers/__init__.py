@@ -55,7 +55,7 @@ from .pptx.pptx_parser import PowerPointParser
 from .excel.excel_parser import ExcelParser
 from .txt.txt_parser import TXTParser
 
-from typing import Dict, Tuple, Optional
+from typing import Callable, Dict, Tuple, Optional
 from contracts import FileSnapshot
 
 
@@ -98,6 +98,32 @@ def build_parser_registry() -> ParserRegistry:
     })
 
 
+# Реестры процесса-исполнителя ProcessPoolExecutor по фабрике
+# (каждый создаётся один раз на процесс)
+_process_registries: Dict[Callable[[], ParserRegistry], ParserRegistry] = {}
+
+
+def parse_in_process(
+    file: FileSnapshot,
+    registry_factory: Callable[[], ParserRegistry] = build_parser_registry,
+) -> str:
+    """
+    Парсинг файла в процессе-исполнителе ProcessPoolExecutor.
+    
+    Парсеры строятся лениво при первом вызове в процессе той же фабрикой,
+    что и реестр IngestDocument, поэтому через pickle передаются только
+    FileSnapshot, ссылка на фабрику и результирующий текст.
+    
+    Args:
+        file: Файл для парсинга
+        registry_factory: Фабрика реестра уровня модуля (передаётся по имени)
+    """
+    registry = _process_registries.get(registry_factory)
+    if registry is None:
+        registry = _process_registries[registry_factory] = registry_factory()
+    return registry.parse(file)
+
+
 __all__ = [
     "BaseParser",
     "WordParser",
@@ -107,4 +133,5 @@ __all__ = [
     "TXTParser",
     "ParserRegistry",
     "build_parser_registry",
+    "parse_in_process",
 ]
@@ -69,7 +69,7 @@ def extract_pdf_metadata(file_path: str) -> Dict:
                 producer = info.get('/Producer', '')
                 specific_metadata['producer'] = str(producer) if producer else ''
             
-            logger.debug(f"PDF-specific metadata | pages={specific_metadata['pages']} author={specific_metadata['author']}")
+            logger.debug("PDF-specific metadata | pages=%s author=%s", specific_metadata['pages'], specific_metadata['author'])
             
     except Exception as e:
         logger.warning(f"PDF-specific metadata extraction failed | file={file_path} error={type(e).__name__}: {e}")
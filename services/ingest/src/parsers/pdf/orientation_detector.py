@@ -58,7 +58,7 @@ def quick_check_orientation(file_path: str) -> Tuple[bool, int]:
         
         if not text or len(text) < 50:
             # Мало текста - возможно отсканированный, нужен OCR
-            logger.debug(f"Low text content ({len(text)} chars), needs OCR check")
+            logger.debug("Low text content (%s chars), needs OCR check", len(text))
             return False, 0  # Не можем определить быстро
         
         # Подсчёт читаемости: важна доля РУССКИХ букв, не просто латиницы
@@ -74,7 +74,7 @@ def quick_check_orientation(file_path: str) -> Tuple[bool, int]:
         russian_ratio = (russian / alpha) * 100
         latin_ratio = (latin / alpha) * 100
         
-        logger.debug(f"Quick check | text={len(text)} alpha={alpha} russian={russian_ratio:.1f}% latin={latin_ratio:.1f}%")
+        logger.debug("Quick check | text=%s alpha=%s russian=%.1f%% latin=%.1f%%", len(text), alpha, russian_ratio, latin_ratio)
         
         # Логика: для русских документов русские буквы должны быть > 20%
         # Если < 20% русских И есть латиница - вероятно перевёрнут
@@ -144,14 +144,14 @@ def detect_best_rotation(file_path: str) -> int:
                 # Оценка: приоритет русским словам
                 score = russian_words * 3 + len(words)
                 
-                logger.debug(f"Angle {angle}° | words={len(words)} russian={russian_words} score={score}")
+                logger.debug("Angle %s° | words=%s russian=%s score=%s", angle, len(words), russian_words, score)
                 
                 if score > best_score:
                     best_score = score
                     best_angle = angle
                     
             except Exception as e:
-                logger.debug(f"OCR failed for angle {angle}° | error={e}")
+                logger.debug("OCR failed for angle %s° | error=%s", angle, e)
             finally:
                 try:
                     os.remove(tmp_path)
@@ -236,7 +236,7 @@ def smart_rotate_pdf(file_path: str) -> Tuple[str, bool]:
     needs_rotation, confidence = quick_check_orientation(file_path)
     
     if not needs_rotation:
-        logger.debug(f"Document orientation OK | confidence={confidence}%")
+        logger.debug("Document orientation OK | confidence=%s%%", confidence)
         return file_path, False
     
     logger.info(f"⚠️ Document may be rotated | confidence={confidence}%, running OCR detection...")
@@ -102,7 +102,7 @@ class PDFParser(BaseParser):
             return 'hybrid', 70
 
         except Exception as e:  # pragma: no cover
-            self.logger.debug(f"Type detection failed | error={e}")
+            self.logger.debug("Type detection failed | error=%s", e)
             return 'hybrid', 50
 
     def _parse_text(self, file_path: str) -> str:
@@ -188,7 +188,7 @@ class PDFParser(BaseParser):
                 text_parts.append(text)
 
             result = '\n\n'.join(text_parts)
-            self.logger.debug(f"Unstructured | elements={len(elements)} length={len(result)}")
+            self.logger.debug("Unstructured | elements=%s length=%s", len(elements), len(result))
             return result
 
         except Exception as e:  # pragma: no cover
@@ -200,7 +200,7 @@ class PDFParser(BaseParser):
             md = MarkItDown()
             result = md.convert(file_path)
             text = result.text_content if hasattr(result, 'text_content') else str(result)
-            self.logger.debug(f"MarkItDown | length={len(text)}")
+            self.logger.debug("MarkItDown | length=%s", len(text))
             return text
         except Exception as e:  # pragma: no cover
             self.logger.warning(f"MarkItDown failed | error={e}")
@@ -211,7 +211,7 @@ class PDFParser(BaseParser):
             doc = fitz.open(file_path)
             text = ''.join(page.get_text() for page in doc)
             doc.close()
-            self.logger.debug(f"PyMuPDF | length={len(text)}")
+            self.logger.debug("PyMuPDF | length=%s", len(text))
             return text
         except Exception as e:  # pragma: no cover
             self.logger.warning(f"PyMuPDF failed | error={e}")
@@ -223,7 +223,7 @@ class PDFParser(BaseParser):
 
             reader = PdfReader(file_path)
             text = ''.join((page.extract_text() or '') for page in reader.pages)
-            self.logger.debug(f"pypdf fallback | length={len(text)}")
+            self.logger.debug("pypdf fallback | length=%s", len(text))
             return text
         except Exception as e:  # pragma: no cover
             self.logger.error(f"Fallback failed | error={e}")
@@ -251,7 +251,7 @@ class PDFParser(BaseParser):
                     config='--psm 6'
                 ).strip()
             except Exception as e:
-                self.logger.debug(f"Tesseract failed on page {idx} | error={e}")
+                self.logger.debug("Tesseract failed on page %s | error=%s", idx, e)
                 continue
 
             if not page_text:
@@ -259,7 +259,7 @@ class PDFParser(BaseParser):
 
             ratio = self._calc_russian_ratio(page_text)
             self.logger.debug(
-                f"OCR page {idx}/{total_pages} | chars={len(page_text)} russian={ratio:.1f}%"
+                "OCR page %s/%s | chars=%s russian=%.1f%%", idx, total_pages, len(page_text), ratio
             )
             text_parts.append(page_text)
 
@@ -45,7 +45,7 @@ def detect_encoding(file_path: str) -> str:
         encoding = detected.get('encoding', 'utf-8')
         confidence = detected.get('confidence', 0.0)
         
-        logger.debug(f"Encoding detection | encoding={encoding} confidence={confidence:.2f}")
+        logger.debug("Encoding detection | encoding=%s confidence=%.2f", encoding, confidence)
         
         # Если уверенность низкая, используем UTF-8
         if confidence < 0.7:
@@ -35,7 +35,7 @@ def extract_txt_metadata(encoding: str, content: str) -> Dict:
         specific_metadata['characters'] = len(content)
         specific_metadata['words'] = len(content.split())
         
-        logger.debug(f"TXT-specific metadata | encoding={encoding} lines={specific_metadata['lines']} words={specific_metadata['words']}")
+        logger.debug("TXT-specific metadata | encoding=%s lines=%s words=%s", encoding, specific_metadata['lines'], specific_metadata['words'])
         
     except Exception as e:
         logger.warning(f"Failed to extract TXT-specific metadata | error={type(e).__name__}: {e}")
@@ -70,13 +70,13 @@ def convert_wmf_to_png(wmf_path: str, image_idx: int, temp_dir: str) -> Optional
                 logger.info(f"WMF converted via wmf2svg: image {image_idx}")
                 return png_path
         else:
-            logger.debug(f"wmf2svg failed with return code {result_wmf.returncode}")
+            logger.debug("wmf2svg failed with return code %s", result_wmf.returncode)
     except (FileNotFoundError, subprocess.TimeoutExpired, Exception) as e:
-        logger.debug(f"wmf2svg conversion exception: {e}")
+        logger.debug("wmf2svg conversion exception: %s", e)
     
     # Попытка 2: Прямой ImageMagick (может работать для некоторых WMF)
     try:
-        logger.debug(f"Trying direct ImageMagick for image {image_idx}")
+        logger.debug("Trying direct ImageMagick for image %s", image_idx)
         result = subprocess.run(
             ['convert', wmf_path, png_path],
             capture_output=True,
@@ -88,7 +88,7 @@ def convert_wmf_to_png(wmf_path: str, image_idx: int, temp_dir: str) -> Optional
             logger.info(f"WMF converted with ImageMagick: image {image_idx}")
             return png_path
     except (FileNotFoundError, subprocess.TimeoutExpired, Exception) as e:
-        logger.debug(f"ImageMagick conversion exception: {e}")
+        logger.debug("ImageMagick conversion exception: %s", e)
     
     try:
         # Попытка 3: Попробовать открыть напрямую через PIL
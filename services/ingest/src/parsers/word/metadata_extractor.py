@@ -57,7 +57,7 @@ def extract_word_metadata(file_path: str) -> Dict:
                 image_count += 1
         specific_metadata['images'] = image_count
         
-        logger.debug(f"Word-specific metadata | author={specific_metadata['author']} pages={specific_metadata['pages']} paragraphs={specific_metadata['paragraphs']}")
+        logger.debug("Word-specific metadata | author=%s pages=%s paragraphs=%s", specific_metadata['author'], specific_metadata['pages'], specific_metadata['paragraphs'])
         
     except Exception as e:
         logger.warning(f"Failed to extract Word-specific metadata | file={file_path} error={e}")
@@ -62,17 +62,17 @@ def extract_images_from_docx(file_path: str) -> List[Dict]:
                         logger.error(f"Failed to save image | index={image_idx} path={image_path}")
                         continue
                     
-                    logger.debug(f"Image saved | index={image_idx} size={len(image_data)} type={content_type}")
+                    logger.debug("Image saved | index=%s size=%s type=%s", image_idx, len(image_data), content_type)
                     
                     # Фильтрация: пропускаем изображения не подходящие для OCR
                     # 1. WMF/EMF — обычно схемы/диаграммы, не содержат текст для OCR
                     if content_type in ('image/x-wmf', 'image/x-emf') or ext in ('.wmf', '.emf'):
-                        logger.debug(f"Skipping WMF/EMF (usually diagrams) | index={image_idx}")
+                        logger.debug("Skipping WMF/EMF (usually diagrams) | index=%s", image_idx)
                         continue
                     
                     # 2. Маленькие изображения (<10KB) — иконки, логотипы
                     if len(image_data) < 10 * 1024:
-                        logger.debug(f"Skipping small image | index={image_idx} size={len(image_data)}")
+                        logger.debug("Skipping small image | index=%s size=%s", image_idx, len(image_data))
                         continue
                     
                     images.append({
@@ -185,7 +185,7 @@ def process_images_with_ocr(images: List[Dict], ocr_strategy: str = "auto") -> L
             try:
                 if os.path.exists(img['path']):
                     os.remove(img['path'])
-                    logger.debug(f"Cleaned up temp image | path={img['path']}")
+                    logger.debug("Cleaned up temp image | path=%s", img['path'])
             except Exception as e:
                 logger.warning(f"Failed to remove temp image | path={img['path']} error={e}")
     
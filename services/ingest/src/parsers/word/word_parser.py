@@ -176,7 +176,7 @@ class WordParser(BaseParser):
             Markdown текст
         """
         try:
-            self.logger.debug(f"Parsing with markitdown")
+            self.logger.debug("Parsing with markitdown")
             result = self.markitdown.convert(file_path)
             
             if result and hasattr(result, 'text_content'):
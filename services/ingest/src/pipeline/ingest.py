@@ -11,6 +11,7 @@ IngestDocument - полный пайплайн обработки докумен
 
 from __future__ import annotations
 import os
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
 from threading import Semaphore
 from typing import Optional, Callable, Dict, Any, List
@@ -24,6 +25,7 @@ from contracts import (
     Embedder, 
     MetaExtractor
 )
+from parsers import parse_in_process
 from settings import settings
 
 
@@ -33,7 +35,10 @@ class IngestDocument:
     
     # Обязательные компоненты
     repository: Repository
-    parser_registry: ParserRegistry
+    # Фабрика реестра парсеров: из неё строится и реестр потока, и реестр
+    # процесса-исполнителя parse_executor. Для parse_executor — функция
+    # уровня модуля (передаётся в процесс через pickle)
+    parser_registry_factory: Callable[[], ParserRegistry]
     chunker: Chunker
     embedder: Embedder
     parse_semaphore: Semaphore
@@ -43,11 +48,22 @@ class IngestDocument:
     # Опциональные компоненты
     cleaner: Optional[Callable[[str], str]] = None
     metaextractor: Optional[MetaExtractor] = None
+    # Пул процессов для парсинга: CPU-тяжёлый разбор документов вне GIL
+    parse_executor: Optional[Executor] = None
     temp_dir: str = field(default_factory=lambda: settings.TMP_MD_PATH)
+    # Отладочная копия распарсенного текста в temp_dir
+    keep_parsed_md: bool = field(default_factory=lambda: settings.KEEP_PARSED_MD)
+    # Пул потоков для записи копии: worker не ждёт диск перед чанкингом
+    save_executor: Optional[Executor] = None
     logger_name: str = field(default="ingest.pipeline")
+    # Каталоги temp_dir, уже созданные этим экземпляром: makedirs не
+    # повторяет stat() по всем родителям для каждого файла
+    _created_dirs: set = field(default_factory=set, init=False, repr=False)
+    parser_registry: ParserRegistry = field(init=False, repr=False)
     
     def __post_init__(self):
         self.logger = get_logger(self.logger_name)
+        self.parser_registry = self.parser_registry_factory()
     
     def __call__(self, file: FileSnapshot) -> bool:
         """
@@ -70,13 +86,23 @@ class IngestDocument:
                 return False
             
             with self.parse_semaphore:
-                file.raw_text = parser.parse(file)
-                self.repository.set_raw_text(file.hash, file.raw_text)
+                if self.parse_executor is not None:
+                    file.raw_text = self.parse_executor.submit(
+                        parse_in_process, file, self.parser_registry_factory
+                    ).result()
+                else:
+                    file.raw_text = parser.parse(file)
+                text_changed = self.repository.replace_raw_text(file.hash, file.raw_text)
             
             parsed_chars = len(file.raw_text) if file.raw_text else 0
             
-            # 1.1. Save to disk for debugging
-            self._save_to_disk(file)
+            # 1.1. Save to disk for debugging (если включено)
+            if self.keep_parsed_md and file.raw_text:
+                if self.save_executor is not None:
+                    # Текст передаётся явно: cleaner ниже заменит file.raw_text
+                    self.save_executor.submit(self._save_to_disk, file.path, file.raw_text)
+                else:
+                    self._save_to_disk(file.path, file.raw_text)
             
             # 2. Clean (если cleaner задан)
             if self.cleaner is not None:
@@ -96,6 +122,17 @@ class IngestDocument:
             else:
                 file.metadata = {}
             
+            # 3.1. Файл изменён, а текст нет (пересохранение, правка свойств):
+            # прежние чанки и эмбеддинги остаются, метаданные — новые
+            if not text_changed and file.status_sync == "updated":
+                with self.repository.session():
+                    kept = self.repository.retag_chunks(file.hash, file.path, file.metadata)
+                    if kept:
+                        self.repository.mark_as_ok(file.hash)
+                if kept:
+                    self.logger.info(f"Text unchanged, chunks kept | chunks={kept}")
+                    return True
+            
             # 4. Chunk
             chunks = self.chunker(file)
             if not chunks:
@@ -122,20 +159,34 @@ class IngestDocument:
         except Exception as exc:
             import traceback
             self.logger.error(f"Pipeline failed | error={exc}")
-            self.logger.debug(f"Traceback:\n{traceback.format_exc()}")
+            self.logger.debug("Traceback:\n%s", traceback.format_exc())
             self.repository.mark_as_error(file.hash)
             return False
     
-    def _save_to_disk(self, file: FileSnapshot) -> None:
+    def _save_to_disk(self, path: str, raw_text: str) -> None:
         """Сохранение распарсенного текста для отладки."""
-        if not file.raw_text:
-            return
-        
         try:
-            temp_file_path = os.path.join(self.temp_dir, f"{file.path}.md")
-            os.makedirs(os.path.dirname(temp_file_path), exist_ok=True)
-            with open(temp_file_path, "w", encoding="utf-8") as f:
-                f.write(file.raw_text)
-            self.logger.debug(f"Saved to {temp_file_path}")
+            temp_file_path = os.path.join(self.temp_dir, f"{path}.md")
+            directory = os.path.dirname(temp_file_path)
+            if directory not in self._created_dirs:
+                os.makedirs(directory, exist_ok=True)
+                self._created_dirs.add(directory)
+            # Кодируем один раз и пишем байты напрямую в fd, без TextIOWrapper
+            # и его промежуточных буферов; os.write может записать не всё
+            data = memoryview(raw_text.encode("utf-8"))
+            flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+            try:
+                fd = os.open(temp_file_path, flags, 0o644)
+            except FileNotFoundError:
+                # Каталог из кэша удалён (очистка temp_dir на ходу):
+                # создаём заново вместо отказа для всех файлов каталога
+                os.makedirs(directory, exist_ok=True)
+                fd = os.open(temp_file_path, flags, 0o644)
+            try:
+                while data:
+                    data = data[os.write(fd, data):]
+            finally:
+                os.close(fd)
+            self.logger.debug("Saved to %s", temp_file_path)
         except Exception as e:
             self.logger.warning(f"Failed to save debug file | error={e}")
@@ -47,17 +47,22 @@ class ProcessFileEvent:
         
         try:
             if file.status_sync == "deleted":
-                # Удаляем чанки и запись о файле
-                deleted_chunks = self.repository.delete_chunks_by_hash(file.hash)
-                self.repository.delete_file_by_hash(file.hash)
-                self.logger.info(f"Deleted | chunks={deleted_chunks}")
+                # Удаляем чанки и запись о файле одним запросом
+                by_hash, stale = self.repository.delete_file_and_chunks(file.hash, file.path)
+                self.logger.info(f"Deleted | chunks={by_hash + stale}")
                 return True
             
             if file.status_sync == "updated":
-                # Удаляем старые чанки перед переобработкой
-                deleted = self.repository.delete_chunks_by_hash(file.hash)
-                self.logger.info(f"Deleted old chunks | count={deleted}")
-                return self.ingest_document(file)
+                # Прежние чанки (старый хэш находится только по пути) эмбеддер
+                # удаляет в одной транзакции с записью новых: до неё поиск
+                # видит прежнюю версию файла, а не пустоту
+                if self.ingest_document(file):
+                    return True
+                # Новая версия не проиндексирована — прежняя не должна
+                # оставаться в поиске
+                by_hash, stale = self.repository.delete_chunks_for_file(file.hash, file.path)
+                self.logger.info(f"Deleted old chunks | count={by_hash + stale} stale={stale}")
+                return False
             
             if file.status_sync == "added":
                 # Полный пайплайн
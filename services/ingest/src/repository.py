@@ -5,17 +5,87 @@ PostgreSQL Repository для Ingest Service.
 """
 
 from __future__ import annotations
+import csv
+import io
+import json
 from contextlib import contextmanager
-from typing import Dict, List, Optional, Any
+from threading import Lock, local
+from weakref import WeakKeyDictionary
+from typing import Dict, List, Optional, Any, Sequence, Tuple
 
+import numpy as np
 import psycopg2
 import psycopg2.extras
+from psycopg2.pool import ThreadedConnectionPool
 
 from logging_config import get_logger
 from contracts import SyncStatus
 
 logger = get_logger("ingest.repository")
 
+# C-энкодер json сериализует список float в литерал pgvector "[a,b,c]"
+# быстрее, чем ",".join(map(str, ...)) в цикле интерпретатора
+_VECTOR_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+# Метаданные чанков в основном на кириллице: без ensure_ascii JSONB-литерал
+# в ~3 раза короче (нет \uXXXX-экранирования), энкодер создаётся один раз
+_METADATA_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+def _to_vector_literal(embedding: List[float]) -> str:
+    """Текстовый литерал pgvector для параметра %s::halfvec."""
+    return _VECTOR_ENCODER.encode(embedding)
+
+
+def _to_jsonb(metadata: Dict[str, Any]) -> psycopg2.extras.Json:
+    """Адаптер метаданных чанка для параметра jsonb."""
+    return psycopg2.extras.Json(metadata, dumps=_METADATA_ENCODER.encode)
+
+
+def _to_vector_literals(embeddings: Sequence[List[float]]) -> List[str]:
+    """
+    Текстовые литералы pgvector для пачки эмбеддингов одной размерности.
+    
+    Форматирование float → str идёт одним вызовом np.savetxt в C, а не
+    по элементу в интерпретаторе. %.9g точно восстанавливает float32
+    (до halfvec округляет уже БД) и вдвое короче repr(float).
+    """
+    if not embeddings:
+        return []
+    
+    try:
+        matrix = np.asarray(embeddings, dtype=np.float32)
+    except ValueError:
+        # Разная размерность — такие строки отклонит сама БД, формат не важен
+        return [_to_vector_literal(embedding) for embedding in embeddings]
+    if matrix.ndim != 2 or matrix.shape[1] == 0:
+        return [_to_vector_literal(embedding) for embedding in embeddings]
+    
+    buffer = io.StringIO()
+    np.savetxt(buffer, matrix, fmt="%.9g", delimiter=",")
+    return [f"[{line}]" for line in buffer.getvalue().splitlines()]
+
+
+def _metadata_prefix(shared_metadata: Optional[Dict[str, Any]]) -> str:
+    """JSON общих метаданных без закрывающей скобки ("" — общих нет)."""
+    if not shared_metadata:
+        return ""
+    return _METADATA_ENCODER.encode(shared_metadata)[:-1]
+
+
+def _merge_metadata_json(prefix: str, metadata: Dict[str, Any]) -> str:
+    """
+    JSONB-литерал метаданных чанка: общий префикс + собственные ключи строки.
+    
+    При совпадении ключей JSONB оставляет последний, т.е. ключ строки —
+    как {**shared_metadata, **metadata}.
+    """
+    own = _METADATA_ENCODER.encode(metadata)
+    if not prefix:
+        return own
+    if own == "{}":
+        return prefix + "}"
+    return f"{prefix},{own[1:]}"
+
 
 class IngestRepository:
     """PostgreSQL репозиторий для Ingest Service."""
@@ -24,25 +94,203 @@ class IngestRepository:
         self, 
         database_url: str,
         files_table: str = "files",
-        chunks_table: str = "chunks"
+        chunks_table: str = "chunks",
+        cache_table: str = "embedding_cache",
+        pool_maxconn: int = 10
     ):
         self.connection_string = database_url
         self.files_table = files_table
         self.chunks_table = chunks_table
+        self.cache_table = cache_table
+        # HNSW-индекс эмбеддингов: для chunks — idx_chunks_embedding
+        # из scripts/setup_supabase/schema_chunks.sql
+        self.embedding_index = f"idx_{chunks_table}_embedding"
+        self.pool_maxconn = pool_maxconn
+        
+        # Пул соединений: потоки worker'а переиспользуют соединения
+        self._pool: Optional[ThreadedConnectionPool] = None
+        self._pool_lock = Lock()
+        # Соединение session() текущего потока: у каждого потока worker'а своё
+        self._local = local()
+        
+        # Запросы, выполняемые на каждый файл: PREPARE один раз на соединение,
+        # дальше EXECUTE без повторного разбора и планирования на сервере
+        self._statements: Dict[str, str] = {
+            "ingest_update_status": f"""
+                UPDATE {self.files_table}
+                SET status_sync = $1, last_checked = CURRENT_TIMESTAMP
+                WHERE hash = $2
+            """,
+            "ingest_update_status_many": f"""
+                UPDATE {self.files_table}
+                SET status_sync = $1, last_checked = CURRENT_TIMESTAMP
+                WHERE hash = ANY($2)
+            """,
+            "ingest_set_raw_text": f"""
+                UPDATE {self.files_table}
+                SET raw_text = $1, last_checked = CURRENT_TIMESTAMP
+                WHERE hash = $2
+            """,
+            # Самообъединение по id: old — версия строки до UPDATE
+            "ingest_replace_raw_text": f"""
+                UPDATE {self.files_table} f
+                SET raw_text = $1, last_checked = CURRENT_TIMESTAMP
+                FROM {self.files_table} old
+                WHERE f.hash = $2 AND old.id = f.id
+                RETURNING old.raw_text IS NOT DISTINCT FROM $1
+            """,
+            # Только полный набор чанков: после сбоя на середине файла число
+            # чанков по пути не совпадает с их total_chunks. Метаданные
+            # собираются заново: новые общие + позиция чанка в документе
+            "ingest_retag_chunks": f"""
+                WITH complete AS (
+                    SELECT 1
+                    FROM {self.chunks_table}
+                    WHERE metadata->>'file_path' = $1
+                    HAVING count(*) = min((metadata->>'total_chunks')::int)
+                       AND count(*) = max((metadata->>'total_chunks')::int)
+                )
+                UPDATE {self.chunks_table}
+                SET metadata = $2::jsonb || jsonb_build_object(
+                    'chunk_index', metadata->'chunk_index',
+                    'total_chunks', metadata->'total_chunks'
+                )
+                WHERE metadata->>'file_path' = $1 AND EXISTS (SELECT 1 FROM complete)
+            """,
+            "ingest_delete_file": f"DELETE FROM {self.files_table} WHERE hash = $1",
+            "ingest_delete_chunks_for_file": f"""
+                WITH deleted AS (
+                    DELETE FROM {self.chunks_table}
+                    WHERE metadata->>'file_hash' = $1
+                       OR metadata->>'file_path' = $2
+                    RETURNING metadata->>'file_hash' AS file_hash
+                )
+                SELECT
+                    COUNT(*) FILTER (WHERE file_hash = $1),
+                    COUNT(*) FILTER (WHERE file_hash IS DISTINCT FROM $1)
+                FROM deleted
+            """,
+            "ingest_delete_file_and_chunks": f"""
+                WITH deleted AS (
+                    DELETE FROM {self.chunks_table}
+                    WHERE metadata->>'file_hash' = $1
+                       OR metadata->>'file_path' = $2
+                    RETURNING metadata->>'file_hash' AS file_hash
+                ), deleted_file AS (
+                    DELETE FROM {self.files_table} WHERE hash = $1
+                )
+                SELECT
+                    COUNT(*) FILTER (WHERE file_hash = $1),
+                    COUNT(*) FILTER (WHERE file_hash IS DISTINCT FROM $1)
+                FROM deleted
+            """,
+        }
+        # Подготовленные запросы каждого соединения пула; закрытое
+        # соединение уходит из словаря вместе со своими PREPARE
+        self._prepared: WeakKeyDictionary = WeakKeyDictionary()
+    
+    def _get_pool(self) -> ThreadedConnectionPool:
+        """Ленивая инициализация пула соединений."""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadedConnectionPool(
+                        minconn=1,
+                        maxconn=self.pool_maxconn,
+                        dsn=self.connection_string
+                    )
+        return self._pool
     
     @contextmanager
-    def get_connection(self):
-        """Context manager для работы с соединением."""
-        conn = psycopg2.connect(self.connection_string)
+    def get_connection(self, autocommit: bool = False):
+        """
+        Context manager для работы с соединением из пула.
+        
+        Args:
+            autocommit: Выполнять запросы без явной транзакции — для методов
+                из одного запроса экономит round-trip'ы BEGIN и COMMIT
+        """
+        session_conn = getattr(self._local, "conn", None)
+        if session_conn is not None:
+            # Внутри session(): соединение и транзакция принадлежат сессии
+            try:
+                yield session_conn
+            except Exception as exc:
+                if not session_conn.closed:
+                    session_conn.rollback()
+                self._local.pending = 0
+                logger.error(f"Database error: {exc}")
+                raise
+            self._local.pending += 1
+            if self._local.pending >= self._local.commit_every:
+                session_conn.commit()
+                self._local.pending = 0
+            return
+        
+        pool = self._get_pool()
+        conn = pool.getconn()
+        conn.autocommit = autocommit
         try:
             yield conn
-            conn.commit()
+            if not autocommit:
+                conn.commit()
         except Exception as exc:
-            conn.rollback()
+            if not autocommit and not conn.closed:
+                conn.rollback()
             logger.error(f"Database error: {exc}")
             raise
         finally:
-            conn.close()
+            # Разорванное соединение не возвращаем в пул
+            if not conn.closed:
+                conn.autocommit = False
+            pool.putconn(conn, close=bool(conn.closed))
+    
+    @contextmanager
+    def session(self, commit_every: int = 100):
+        """
+        Одно соединение пула на все вызовы методов в текущем потоке.
+        
+        Методы внутри сессии не берут соединение из пула на каждый запрос и
+        фиксируют изменения раз в commit_every операций и на выходе. Ошибка
+        операции откатывает все незафиксированные операции сессии.
+        
+        Args:
+            commit_every: Число операций на один COMMIT (1 — как без сессии)
+        """
+        if getattr(self._local, "conn", None) is not None:
+            # Вложенная сессия работает в транзакции внешней
+            yield
+            return
+        
+        pool = self._get_pool()
+        conn = pool.getconn()
+        conn.autocommit = False
+        self._local.conn = conn
+        self._local.pending = 0
+        self._local.commit_every = commit_every
+        try:
+            yield
+            conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            pool.putconn(conn, close=bool(conn.closed))
+    
+    def _execute_prepared(self, conn, cur, name: str, params: Tuple[Any, ...]) -> None:
+        """
+        Выполнить запрос из self._statements через EXECUTE.
+        
+        PREPARE выполняется при первом вызове запроса на данном соединении.
+        """
+        prepared = self._prepared.setdefault(conn, set())
+        if name not in prepared:
+            cur.execute(f"PREPARE {name} AS {self._statements[name]}")
+            prepared.add(name)
+        placeholders = ", ".join(["%s"] * len(params))
+        cur.execute(f"EXECUTE {name}({placeholders})", params)
     
     # === Status management ===
     
@@ -58,18 +306,34 @@ class IngestRepository:
         """Пометить файл как находящийся в обработке."""
         return self._update_status(file_hash, SyncStatus.PROCESSED)
     
+    def mark_many_as(self, status: SyncStatus, file_hashes: Sequence[str]) -> int:
+        """
+        Пометить пачку файлов одним UPDATE ... WHERE hash = ANY(...).
+        
+        Returns:
+            Количество обновлённых записей (0 при ошибке)
+        """
+        if not file_hashes:
+            return 0
+        
+        try:
+            with self.get_connection(autocommit=True) as conn:
+                with conn.cursor() as cur:
+                    self._execute_prepared(
+                        conn, cur, "ingest_update_status_many", (status.value, list(file_hashes))
+                    )
+                    return cur.rowcount
+        except Exception as exc:
+            logger.error(f"Failed to update status to {status} for {len(file_hashes)} files: {exc}")
+            return 0
+    
     def _update_status(self, file_hash: str, status: SyncStatus) -> bool:
         """Обновить статус файла."""
         try:
-            with self.get_connection() as conn:
+            with self.get_connection(autocommit=True) as conn:
                 with conn.cursor() as cur:
-                    cur.execute(
-                        f"""
-                        UPDATE {self.files_table}
-                        SET status_sync = %s, last_checked = CURRENT_TIMESTAMP
-                        WHERE hash = %s
-                        """,
-                        (status.value, file_hash),
+                    self._execute_prepared(
+                        conn, cur, "ingest_update_status", (status.value, file_hash)
                     )
                     return cur.rowcount > 0
         except Exception as exc:
@@ -80,33 +344,42 @@ class IngestRepository:
     
     def delete_file_by_hash(self, file_hash: str) -> bool:
         """Удалить запись о файле по хэшу."""
-        with self.get_connection() as conn:
+        with self.get_connection(autocommit=True) as conn:
             with conn.cursor() as cur:
-                cur.execute(
-                    f"DELETE FROM {self.files_table} WHERE hash = %s",
-                    (file_hash,),
-                )
+                self._execute_prepared(conn, cur, "ingest_delete_file", (file_hash,))
                 return cur.rowcount > 0
     
     def set_raw_text(self, file_hash: str, raw_text: str) -> bool:
         """Сохранить raw_text файла."""
-        with self.get_connection() as conn:
+        with self.get_connection(autocommit=True) as conn:
             with conn.cursor() as cur:
-                cur.execute(
-                    f"""
-                    UPDATE {self.files_table}
-                    SET raw_text = %s, last_checked = CURRENT_TIMESTAMP
-                    WHERE hash = %s
-                    """,
-                    (raw_text, file_hash),
+                self._execute_prepared(
+                    conn, cur, "ingest_set_raw_text", (raw_text, file_hash)
                 )
                 return cur.rowcount > 0
     
+    def replace_raw_text(self, file_hash: str, raw_text: str) -> bool:
+        """
+        Сохранить raw_text файла и сравнить его с прежним в той же строке.
+        
+        Текст сравнивает сервер: прежний raw_text не передаётся клиенту.
+        
+        Returns:
+            False, если сохранённый ранее текст совпал с новым
+        """
+        with self.get_connection(autocommit=True) as conn:
+            with conn.cursor() as cur:
+                self._execute_prepared(
+                    conn, cur, "ingest_replace_raw_text", (raw_text, file_hash)
+                )
+                rows = cur.fetchall()
+                return not rows or not all(unchanged for unchanged, in rows)
+    
     # === Chunk management ===
     
     def delete_chunks_by_hash(self, file_hash: str) -> int:
         """Удалить все чанки файла по хэшу."""
-        with self.get_connection() as conn:
+        with self.get_connection(autocommit=True) as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     f"DELETE FROM {self.chunks_table} WHERE metadata->>'file_hash' = %s",
@@ -114,6 +387,63 @@ class IngestRepository:
                 )
                 return cur.rowcount
     
+    def retag_chunks(self, file_hash: str, file_path: str, doc_metadata: Dict[str, Any]) -> int:
+        """
+        Перепривязать чанки файла по пути к новому хэшу и метаданным.
+        
+        Для изменённого файла с прежним текстом: чанки и эмбеддинги остаются,
+        метаданные заменяются на новые метаданные документа (как их записал
+        бы эмбеддер), от прежних остаются только chunk_index и total_chunks.
+        Неполный набор чанков (прерванная обработка) не трогается.
+        
+        Returns:
+            Количество перепривязанных чанков (0 — файл нужно обработать)
+        """
+        shared_metadata = {**doc_metadata, 'file_hash': file_hash, 'file_path': file_path}
+        with self.get_connection(autocommit=True) as conn:
+            with conn.cursor() as cur:
+                self._execute_prepared(
+                    conn, cur, "ingest_retag_chunks",
+                    (file_path, _METADATA_ENCODER.encode(shared_metadata))
+                )
+                return cur.rowcount
+    
+    def delete_chunks_for_file(self, file_hash: str, file_path: str) -> Tuple[int, int]:
+        """
+        Удалить чанки файла по хэшу и по пути одним запросом.
+        
+        Чанки прежней версии изменённого файла хранят старый file_hash,
+        поэтому находятся только по file_path.
+        
+        Returns:
+            (удалено по текущему хэшу, удалено устаревших с другим хэшем)
+        """
+        with self.get_connection(autocommit=True) as conn:
+            with conn.cursor() as cur:
+                self._execute_prepared(
+                    conn, cur, "ingest_delete_chunks_for_file", (file_hash, file_path)
+                )
+                by_hash, stale = cur.fetchone()
+                return by_hash, stale
+    
+    def delete_file_and_chunks(self, file_hash: str, file_path: str) -> Tuple[int, int]:
+        """
+        Удалить чанки файла (по хэшу и по пути) и запись о файле одним запросом.
+        
+        Оба DELETE в одном операторе — атомарно: чанки без записи о файле
+        (или наоборот) не остаются.
+        
+        Returns:
+            (удалено по текущему хэшу, удалено устаревших с другим хэшем)
+        """
+        with self.get_connection(autocommit=True) as conn:
+            with conn.cursor() as cur:
+                self._execute_prepared(
+                    conn, cur, "ingest_delete_file_and_chunks", (file_hash, file_path)
+                )
+                by_hash, stale = cur.fetchone()
+                return by_hash, stale
+    
     def save_chunk(
         self, 
         content: str, 
@@ -121,42 +451,179 @@ class IngestRepository:
         embedding: Optional[List[float]] = None
     ) -> bool:
         """Сохранить чанк с метаданными и эмбеддингом."""
-        with self.get_connection() as conn:
+        if embedding is not None:
+            # Один чанк — частный случай пакетной вставки
+            return self.save_chunks([(content, metadata, embedding)]) == 1
+        
+        with self.get_connection(autocommit=True) as conn:
             with conn.cursor() as cur:
-                if embedding is not None:
-                    embedding_str = "[" + ",".join(map(str, embedding)) + "]"
-                    cur.execute(
-                        f"""
-                        INSERT INTO {self.chunks_table} (content, metadata, embedding)
-                        VALUES (%s, %s, %s::vector)
-                        """,
-                        (content, psycopg2.extras.Json(metadata), embedding_str),
-                    )
-                else:
-                    cur.execute(
-                        f"""
-                        INSERT INTO {self.chunks_table} (content, metadata)
-                        VALUES (%s, %s)
-                        """,
-                        (content, psycopg2.extras.Json(metadata)),
-                    )
+                cur.execute(
+                    f"""
+                    INSERT INTO {self.chunks_table} (content, metadata)
+                    VALUES (%s, %s)
+                    """,
+                    (content, _to_jsonb(metadata)),
+                )
                 return True
     
-    def get_chunks_count(self, file_hash: str) -> int:
-        """Получить количество чанков для файла."""
+    def save_chunks(
+        self,
+        rows: Sequence[Tuple[str, Dict[str, Any], List[float]]],
+        shared_metadata: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """
+        Сохранить пачку чанков одним COPY ... FROM STDIN в одной транзакции.
+        
+        COPY не разбирает и не планирует INSERT на каждые page_size строк:
+        сервер только парсит CSV-поток.
+        
+        Args:
+            rows: Последовательность (content, metadata, embedding)
+            shared_metadata: Общие метаданные всех строк (документ, файл).
+                Кодируются в JSON один раз на пачку; ключи строки важнее
+            
+        Returns:
+            Количество вставленных строк
+        """
+        if not rows:
+            return 0
+        
+        vectors = _to_vector_literals([embedding for _, _, embedding in rows])
+        prefix = _metadata_prefix(shared_metadata)
+        buffer = io.StringIO()
+        # QUOTE_ALL: пустая строка уходит как "", а не как NULL
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL, lineterminator="\n")
+        writer.writerows(
+            (content, _merge_metadata_json(prefix, metadata), vector)
+            for (content, metadata, _), vector in zip(rows, vectors)
+        )
+        buffer.seek(0)
+        
         with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.copy_expert(
+                    f"""
+                    COPY {self.chunks_table} (content, metadata, embedding)
+                    FROM STDIN WITH (FORMAT csv)
+                    """,
+                    buffer,
+                )
+                return len(rows)
+    
+    # === Embedding cache ===
+    
+    def get_cached_embeddings(self, keys: Sequence[bytes]) -> Dict[bytes, List[float]]:
+        """
+        Получить эмбеддинги из кэша по sha256-ключам содержимого.
+        
+        Returns:
+            Словарь {ключ: эмбеддинг} только для найденных ключей
+        """
+        if not keys:
+            return {}
+        
+        with self.get_connection(autocommit=True) as conn:
             with conn.cursor() as cur:
                 cur.execute(
-                    f"SELECT COUNT(*) FROM {self.chunks_table} WHERE metadata->>'file_hash' = %s",
-                    (file_hash,),
+                    f"""
+                    SELECT content_sha256, embedding::text
+                    FROM {self.cache_table}
+                    WHERE content_sha256 = ANY(%s)
+                    """,
+                    (list(keys),),
                 )
+                return {bytes(key): json.loads(vector) for key, vector in cur.fetchall()}
+    
+    def save_cached_embeddings(self, items: Sequence[Tuple[bytes, List[float]]]) -> int:
+        """Сохранить эмбеддинги в кэш (существующие ключи не перезаписываются)."""
+        if not items:
+            return 0
+        
+        vectors = _to_vector_literals([embedding for _, embedding in items])
+        values = [(key, vector) for (key, _), vector in zip(items, vectors)]
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                psycopg2.extras.execute_values(
+                    cur,
+                    f"""
+                    INSERT INTO {self.cache_table} (content_sha256, embedding) VALUES %s
+                    ON CONFLICT (content_sha256) DO NOTHING
+                    """,
+                    values,
+                    template="(%s, %s::halfvec)",
+                    page_size=500,
+                )
+                return len(values)
+    
+    def is_chunks_empty(self) -> bool:
+        """Проверить, что таблица чанков пуста (первичная загрузка)."""
+        with self.get_connection(autocommit=True) as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT NOT EXISTS (SELECT 1 FROM {self.chunks_table})")
                 return cur.fetchone()[0]
     
+    @contextmanager
+    def bulk_load(self, maintenance_workers: int = 4):
+        """
+        Массовая загрузка без инкрементального обновления HNSW-индекса.
+        
+        Индекс эмбеддингов удаляется на время загрузки и строится
+        один раз в конце — для первичного наполнения пустой таблицы.
+        Если процесс убит до конца загрузки, индекс восстанавливает
+        ensure_embedding_index() при следующем запуске.
+        
+        Args:
+            maintenance_workers: Параллельные процессы для CREATE INDEX
+        """
+        with self.get_connection(autocommit=True) as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {self.embedding_index}")
+        logger.info(f"Bulk load started | index {self.embedding_index} dropped")
+        try:
+            yield
+        finally:
+            logger.info("Bulk load finished")
+            self.ensure_embedding_index(maintenance_workers)
+    
+    def ensure_embedding_index(self, maintenance_workers: int = 4) -> bool:
+        """
+        Построить HNSW-индекс эмбеддингов, если его нет.
+        
+        Args:
+            maintenance_workers: Параллельные процессы для CREATE INDEX
+            
+        Returns:
+            True, если индекс пришлось строить
+        """
+        with self.get_connection(autocommit=True) as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT to_regclass(%s) IS NOT NULL", (self.embedding_index,))
+                if cur.fetchone()[0]:
+                    return False
+                
+                logger.info(f"Building index {self.embedding_index}...")
+                cur.execute(
+                    "SET max_parallel_maintenance_workers = %s",
+                    (maintenance_workers,),
+                )
+                try:
+                    cur.execute(
+                        f"""
+                        CREATE INDEX IF NOT EXISTS {self.embedding_index}
+                        ON {self.chunks_table} USING hnsw (embedding halfvec_cosine_ops)
+                        """
+                    )
+                finally:
+                    # Соединение вернётся в пул — не оставляем настройку сессии
+                    cur.execute("RESET max_parallel_maintenance_workers")
+        logger.info(f"Index {self.embedding_index} built")
+        return True
+    
     # === Utility ===
     
     def reset_processed_to_added(self) -> int:
         """Сбросить зависшие 'processed' статусы в 'added'."""
-        with self.get_connection() as conn:
+        with self.get_connection(autocommit=True) as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     f"""
@@ -6,10 +6,15 @@ Defaults отсутствуют — приложение упадёт если E
 """
 
 import json
+import os
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
 from typing import List
 
+# Потолок автоматического WORKER_MAX_CONCURRENT_FILES: дальше потоки
+# упираются в GIL и общий Ollama, а не в ядра
+MAX_AUTO_CONCURRENT_FILES = 16
+
 
 class Settings(BaseSettings):
     """
@@ -30,14 +35,16 @@ class Settings(BaseSettings):
     
     # === WORKER SETTINGS ===
     WORKER_POLL_INTERVAL: int
-    WORKER_MAX_CONCURRENT_FILES: int
+    WORKER_MAX_CONCURRENT_FILES: int  # 0 - по числу CPU, не больше MAX_AUTO_CONCURRENT_FILES
     WORKER_MAX_CONCURRENT_PARSING: int
     WORKER_MAX_CONCURRENT_EMBEDDING: int
     WORKER_MAX_CONCURRENT_LLM: int
+    WORKER_PARSE_PROCESSES: int  # 0 - парсинг в потоках worker'а без пула процессов, -1 - половина CPU
     
     # === PATHS ===
     MONITORED_PATH: str
     TMP_MD_PATH: str
+    KEEP_PARSED_MD: bool  # Сохранять распарсенный текст в TMP_MD_PATH (отладка)
     
     # === PIPELINE SETTINGS ===
     ENABLE_CLEANER: bool
@@ -63,6 +70,22 @@ class Settings(BaseSettings):
                 return [x.strip() for x in v.split(',') if x.strip()]
         return v
     
+    @field_validator('WORKER_PARSE_PROCESSES')
+    @classmethod
+    def resolve_parse_processes(cls, v):
+        """-1 — половина CPU машины: остальные ядра остаются потокам пайплайна."""
+        if v < 0:
+            return max(1, (os.cpu_count() or 2) // 2)
+        return v
+    
+    @field_validator('WORKER_MAX_CONCURRENT_FILES')
+    @classmethod
+    def resolve_concurrent_files(cls, v):
+        """0 — подобрать по числу CPU машины."""
+        if v <= 0:
+            return min(os.cpu_count() or 4, MAX_AUTO_CONCURRENT_FILES)
+        return v
+    
     class Config:
         case_sensitive = True
 
@@ -4,13 +4,15 @@ Worker - управление параллельной обработкой фа
 Опрашивает FileWatcher API и обрабатывает файлы в пуле потоков.
 """
 
+import queue
 import time
 import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Callable, Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Callable, Optional, Dict, Any, List
 
 from logging_config import get_logger
-from contracts import Repository
+from contracts import Repository, SyncStatus
 from settings import settings
 
 logger = get_logger("ingest.worker")
@@ -35,13 +37,27 @@ class Worker:
         self.filewatcher_api_url = filewatcher_api_url
         self.process_file = process_file_func
         self.processed_count = 0
+        # Keep-alive сессия: опрос /api/next-file на каждый файл идёт по
+        # одному TCP-соединению вместо нового handshake на каждый запрос
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        # FileWatcher без /api/next-files: после первого 404 — по одному файлу
+        self._batch_supported = True
     
-    def _get_next_file(self) -> Optional[Dict[str, Any]]:
-        """Получить следующий файл из очереди FileWatcher."""
+    def _get_next_file(self, wait: float = 0) -> Optional[Dict[str, Any]]:
+        """
+        Получить следующий файл из очереди FileWatcher.
+        
+        Args:
+            wait: Сколько секунд FileWatcher может держать запрос до появления
+                файла (long-poll); 0 — сразу 204 при пустой очереди
+        """
         try:
-            response = requests.get(
+            response = self._session.get(
                 f"{self.filewatcher_api_url}/api/next-file",
-                timeout=5
+                params={"wait": wait} if wait else None,
+                timeout=5 + wait
             )
             if response.status_code == 204:
                 return None  # Очередь пуста
@@ -49,12 +65,60 @@ class Worker:
             return response.json()
         except Exception as e:
             logger.error(f"Failed to get next file | error={e}")
+            # FileWatcher недоступен: та же пауза, что и у long-poll
+            time.sleep(wait)
             return None
     
+    def _get_next_files(self, count: int, wait: float = 0) -> List[Dict[str, Any]]:
+        """
+        Получить до count файлов из очереди FileWatcher одним запросом.
+        
+        Args:
+            count: Сколько файлов запросить (число свободных слотов)
+            wait: Long-poll, как у _get_next_file
+        """
+        if not self._batch_supported:
+            file_info = self._get_next_file(wait=wait)
+            return [file_info] if file_info is not None else []
+        
+        try:
+            params = {"count": count}
+            if wait:
+                params["wait"] = wait
+            response = self._session.get(
+                f"{self.filewatcher_api_url}/api/next-files",
+                params=params,
+                timeout=5 + wait
+            )
+            if response.status_code == 404:
+                logger.warning("FileWatcher /api/next-files not found, falling back to /api/next-file")
+                self._batch_supported = False
+                return self._get_next_files(count, wait)
+            if response.status_code == 204:
+                return []  # Очередь пуста
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.error(f"Failed to get next files | error={e}")
+            # FileWatcher недоступен: та же пауза, что и у long-poll
+            time.sleep(wait)
+            return []
+    
+    def _collect_result(self, future: Future, file_path: str) -> None:
+        """Учесть результат завершённой задачи."""
+        try:
+            success = future.result()
+            if success:
+                self.processed_count += 1
+                logger.info(f"📊 Total processed: {self.processed_count}")
+        except Exception as e:
+            logger.error(f"Task failed | path={file_path} error={e}")
+    
     def start(
         self, 
         poll_interval: int = 5, 
-        max_workers: int = 5
+        max_workers: int = 5,
+        stop_when_idle: bool = False
     ):
         """
         Запустить worker с параллельной обработкой.
@@ -62,51 +126,72 @@ class Worker:
         Args:
             poll_interval: Интервал опроса очереди в секундах
             max_workers: Максимальное количество параллельных задач
+            stop_when_idle: Завершиться, когда очередь пуста и задач нет
+                (режим первичной загрузки)
         """
         logger.info(f"🚀 Starting worker | max_workers={max_workers} poll_interval={poll_interval}s")
         
         with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest") as executor:
             futures = {}  # future -> file_path mapping
+            # Завершённые задачи: callback кладёт future в очередь, цикл не
+            # перебирает f.done() по всем задачам и просыпается сразу.
+            # SimpleQueue — C-реализация без учёта task_done/maxsize
+            done_queue: "queue.SimpleQueue[Future]" = queue.SimpleQueue()
             
             while True:
                 try:
                     # Удаляем завершённые задачи
-                    done_futures = [f for f in list(futures.keys()) if f.done()]
-                    for future in done_futures:
-                        file_path = futures[future]
+                    while True:
                         try:
-                            success = future.result()
-                            if success:
-                                self.processed_count += 1
-                                logger.info(f"📊 Total processed: {self.processed_count}")
-                        except Exception as e:
-                            logger.error(f"Task failed | path={file_path} error={e}")
-                        del futures[future]
+                            future = done_queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        self._collect_result(future, futures.pop(future))
                     
-                    # Если есть свободные слоты, берём новые файлы
+                    # Если есть свободные слоты, берём новые файлы — все
+                    # слоты одним запросом. Соединение с БД берётся только на
+                    # UPDATE статуса, не на время long-poll к FileWatcher
                     while len(futures) < max_workers:
-                        file_info = self._get_next_file()
+                        # Простаивающий worker ждёт файл на стороне
+                        # FileWatcher; с активными задачами — не ждём
+                        idle = not futures and not stop_when_idle
+                        batch = self._get_next_files(
+                            max_workers - len(futures),
+                            wait=poll_interval if idle else 0
+                        )
                         
-                        if file_info is None:
+                        if not batch:
                             break  # Очередь пуста
                         
-                        # Помечаем файл как processed СРАЗУ
-                        self.repository.mark_as_processed(file_info['hash'])
+                        # /api/next-files помечает файлы processed сам. Старый
+                        # FileWatcher (только /api/next-file) — помечаем СРАЗУ,
+                        # иначе следующий запрос вернёт те же файлы
+                        if not self._batch_supported:
+                            self.repository.mark_many_as(
+                                SyncStatus.PROCESSED, [file_info['hash'] for file_info in batch]
+                            )
                         
-                        # Запускаем обработку в отдельном потоке
-                        future = executor.submit(self.process_file, file_info)
-                        futures[future] = file_info['path']
+                        # Запускаем обработку в отдельных потоках
+                        for file_info in batch:
+                            future = executor.submit(self.process_file, file_info)
+                            futures[future] = file_info['path']
+                            future.add_done_callback(done_queue.put)
                     
                     # Ждём
                     if not futures:
-                        logger.debug("Queue is empty, waiting...")
-                        time.sleep(poll_interval)
-                    elif file_info is None:
-                        # Есть активные задачи, но очередь пуста - ждём подольше
-                        time.sleep(poll_interval)
+                        if stop_when_idle:
+                            logger.info("Queue drained, stopping")
+                            break
+                        # Пустой long-poll уже выждал poll_interval
+                        logger.debug("Queue is empty, polling again...")
                     else:
-                        # Есть и задачи, и файлы в очереди - быстрый цикл
-                        time.sleep(0.2)
+                        # Есть активные задачи: ждём освобождения слота, но не
+                        # дольше poll_interval (очередь могла пополниться)
+                        try:
+                            future = done_queue.get(timeout=poll_interval)
+                        except queue.Empty:
+                            continue
+                        self._collect_result(future, futures.pop(future))
                         
                 except KeyboardInterrupt:
                     logger.info("Shutting down worker...")
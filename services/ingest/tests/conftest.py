@@ -5,6 +5,8 @@ import sys
 import os
 from pathlib import Path
 
+import pytest
+
 # Загружаем тестовые ENV переменные
 env_file = Path(__file__).parent.parent / ".env.test"
 if env_file.exists():
@@ -18,3 +20,24 @@ if env_file.exists():
 # Добавляем src в путь для импортов
 src_path = Path(__file__).parent.parent / "src"
 sys.path.insert(0, str(src_path))
+
+
+@pytest.fixture(scope="session")
+def parser_registry():
+    """Реестр парсеров, общий для всей сессии (WordParser поднимает MarkItDown)."""
+    from parsers import build_parser_registry
+    return build_parser_registry()
+
+
+@pytest.fixture(scope="session")
+def txt_parser():
+    """TXTParser, общий для всей сессии — парсеры не хранят состояние между вызовами."""
+    from parsers import TXTParser
+    return TXTParser()
+
+
+@pytest.fixture(scope="session")
+def excel_parser():
+    """ExcelParser с небольшим лимитом строк на таблицу, общий для сессии."""
+    from parsers import ExcelParser
+    return ExcelParser(max_rows_per_table=50)
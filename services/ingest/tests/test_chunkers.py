@@ -2,10 +2,15 @@
 Тесты для чанкеров.
 """
 import pytest
+from unittest.mock import MagicMock
 from contracts import FileSnapshot
 from chunkers import simple_chunker, smart_chunker, build_chunker, CHUNKERS
 
 
+# Длинный параграф (~1800 символов) строится один раз на модуль
+_LONG_PARAGRAPH = "Слово " * 300
+
+
 class TestSimpleChunker:
     """Тесты simple_chunker."""
     
@@ -38,7 +43,7 @@ class TestSimpleChunker:
     def test_long_text_splits(self):
         """Длинный текст разбивается на части."""
         # Генерируем текст > 1000 символов
-        long_para = "Слово " * 300  # ~1800 символов
+        long_para = _LONG_PARAGRAPH
         file = FileSnapshot(hash="test", path="/test.txt", raw_text=long_para)
         chunks = simple_chunker(file)
         
@@ -69,6 +74,34 @@ class TestSmartChunker:
         chunks = smart_chunker(file)
         
         assert chunks == []
+    
+    def test_fallback_on_error(self):
+        """При ошибке сплиттера используется simple_chunker."""
+        file = FileSnapshot(
+            hash="test",
+            path="/test.txt",
+            raw_text="Первый параграф.\n\nВторой параграф."
+        )
+        broken_splitter = MagicMock()
+        broken_splitter.split_text.side_effect = RuntimeError("splitter failed")
+        
+        chunks = smart_chunker(file, splitter_factory=lambda **kwargs: broken_splitter)
+        
+        assert chunks == simple_chunker(file)
+    
+    def test_boundary_splitter_overlap(self):
+        """Fallback-сплиттер режет по границам предложений и сохраняет overlap."""
+        from chunkers.smart import _split_by_boundaries
+        
+        text = " ".join(f"Предложение номер {i}." for i in range(40))
+        chunks = _split_by_boundaries(text, chunk_size=100, chunk_overlap=30)
+        
+        assert len(chunks) > 1
+        assert all(len(c) <= 100 for c in chunks)
+        assert all(c.endswith(".") for c in chunks)
+        # Начало следующего чанка повторяет хвост предыдущего
+        for prev, cur in zip(chunks, chunks[1:]):
+            assert cur.split(".")[0] in prev
 
 
 class TestChunkerRegistry:
@@ -1,10 +1,29 @@
 """
 Тесты для эмбеддеров.
 """
+import json
+
 import pytest
+import requests
 from unittest.mock import MagicMock, patch
 from contracts import FileSnapshot
 from embedders import EMBEDDERS, build_embedder
+from embedders.ollama import ollama_embedder, _get_embeddings_batch, _cache_key
+
+
+# Фиктивные эмбеддинги вычисляются один раз на модуль
+_FAKE_EMBEDDING_DIM = 1024
+_FAKE_EMBEDDINGS = [[0.1] * _FAKE_EMBEDDING_DIM, [0.2] * _FAKE_EMBEDDING_DIM]
+# Тело ответа Ollama /api/embed сериализуется один раз при загрузке модуля
+_EMBED_RESPONSE_BODY = json.dumps({"embeddings": _FAKE_EMBEDDINGS}).encode()
+
+
+def _embed_response(status_code: int = 200, body: bytes = _EMBED_RESPONSE_BODY) -> requests.Response:
+    """Настоящий Response с готовым телом: response.json() разбирает байты как в проде."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    return response
 
 
 class TestEmbedderRegistry:
@@ -25,26 +44,24 @@ class TestOllamaEmbedder:
     
     def test_empty_chunks_returns_zero(self):
         """Пустой список чанков возвращает 0."""
-        from embedders.ollama import ollama_embedder
-        
         repo = MagicMock()
         file = FileSnapshot(hash="test", path="/test.txt", raw_text="")
         
         result = ollama_embedder(repo, file, [], {})
         
         assert result == 0
-        repo.save_chunk.assert_not_called()
+        repo.save_chunks.assert_not_called()
     
     @patch('embedders.ollama._get_embeddings_batch')
     def test_successful_embedding(self, mock_get_embeddings):
         """Успешный эмбеддинг сохраняет чанки."""
-        from embedders.ollama import ollama_embedder
-        
         # Мокаем эмбеддинги
-        mock_get_embeddings.return_value = [[0.1] * 1024, [0.2] * 1024]
+        mock_get_embeddings.return_value = _FAKE_EMBEDDINGS
         
         repo = MagicMock()
-        repo.delete_chunks_by_hash.return_value = 0
+        repo.delete_chunks_for_file.return_value = (0, 0)
+        repo.get_cached_embeddings.return_value = {}
+        repo.save_chunks.side_effect = lambda rows, shared_metadata=None: len(rows)
         
         file = FileSnapshot(hash="test123", path="/test.txt", raw_text="")
         chunks = ["Chunk 1", "Chunk 2"]
@@ -52,18 +69,88 @@ class TestOllamaEmbedder:
         result = ollama_embedder(repo, file, chunks, {"extension": "txt"})
         
         assert result == 2
-        assert repo.save_chunk.call_count == 2
-        repo.delete_chunks_by_hash.assert_called_once_with("test123")
+        # Оба чанка батча сохраняются одним вызовом
+        repo.save_chunks.assert_called_once()
+        rows = repo.save_chunks.call_args[0][0]
+        assert [row[1]['chunk_index'] for row in rows] == [0, 1]
+        # Общие метаданные передаются один раз на батч, а не в каждой строке
+        assert repo.save_chunks.call_args.kwargs["shared_metadata"] == {
+            "extension": "txt", "file_hash": "test123", "file_path": "/test.txt", "total_chunks": 2
+        }
+        repo.delete_chunks_for_file.assert_called_once_with("test123", "/test.txt")
+    
+    @patch('embedders.ollama.BATCH_SIZE', 1)
+    @patch('embedders.ollama._get_embeddings_batch')
+    def test_batch_save_failure_keeps_other_batches(self, mock_get_embeddings):
+        """Ошибка записи одного батча не теряет остальные (запись в фоне)."""
+        mock_get_embeddings.side_effect = lambda texts: _FAKE_EMBEDDINGS[:len(texts)]
+        
+        repo = MagicMock()
+        repo.delete_chunks_for_file.return_value = (0, 0)
+        repo.get_cached_embeddings.return_value = {}
+        repo.save_chunks.side_effect = [RuntimeError("db down"), 1]
+        
+        file = FileSnapshot(hash="test123", path="/test.txt", raw_text="")
+        
+        result = ollama_embedder(repo, file, ["Chunk 1", "Chunk 2"], {})
+        
+        assert result == 1
+        assert repo.save_chunks.call_count == 2
+        indices = [call.args[0][0][1]['chunk_index'] for call in repo.save_chunks.call_args_list]
+        assert indices == [0, 1]
+        # Запись первого батча откатилась вместе с удалением — второй удаляет снова
+        assert repo.delete_chunks_for_file.call_count == 2
+    
+    @patch('embedders.ollama._get_embeddings_batch')
+    def test_cached_chunks_not_reembedded(self, mock_get_embeddings):
+        """Чанки из кэша не отправляются в Ollama, в кэш пишутся только промахи."""
+        mock_get_embeddings.return_value = [_FAKE_EMBEDDINGS[1]]
+        
+        repo = MagicMock()
+        repo.delete_chunks_for_file.return_value = (0, 0)
+        repo.get_cached_embeddings.return_value = {_cache_key("Chunk 1"): _FAKE_EMBEDDINGS[0]}
+        repo.save_chunks.side_effect = lambda rows, shared_metadata=None: len(rows)
+        
+        file = FileSnapshot(hash="test123", path="/test.txt", raw_text="")
+        
+        result = ollama_embedder(repo, file, ["Chunk 1", "Chunk 2"], {})
+        
+        assert result == 2
+        mock_get_embeddings.assert_called_once_with(["Chunk 2"])
+        repo.save_cached_embeddings.assert_called_once_with(
+            [(_cache_key("Chunk 2"), _FAKE_EMBEDDINGS[1])]
+        )
+        rows = repo.save_chunks.call_args[0][0]
+        assert [row[2] for row in rows] == _FAKE_EMBEDDINGS
+    
+    @patch('embedders.ollama._get_embeddings_batch')
+    def test_cache_and_chunks_written_in_one_session(self, mock_get_embeddings):
+        """Кэш и чанки батча пишутся внутри одной сессии репозитория."""
+        mock_get_embeddings.return_value = _FAKE_EMBEDDINGS
+        
+        repo = MagicMock()
+        repo.delete_chunks_for_file.return_value = (0, 0)
+        repo.get_cached_embeddings.return_value = {}
+        calls = []
+        repo.session.return_value.__enter__.side_effect = lambda: calls.append("enter")
+        repo.session.return_value.__exit__.side_effect = lambda *exc: calls.append("exit")
+        repo.save_cached_embeddings.side_effect = lambda items: calls.append("cache")
+        repo.delete_chunks_for_file.side_effect = lambda *args: calls.append("delete") or (0, 0)
+        repo.save_chunks.side_effect = lambda rows, shared_metadata=None: calls.append("chunks") or len(rows)
+        
+        file = FileSnapshot(hash="test123", path="/test.txt", raw_text="")
+        
+        assert ollama_embedder(repo, file, ["Chunk 1", "Chunk 2"], {}) == 2
+        assert calls == ["enter", "cache", "delete", "chunks", "exit"]
     
     @patch('embedders.ollama._get_embeddings_batch')
     def test_embedding_failure_returns_zero(self, mock_get_embeddings):
         """При ошибке эмбеддинга возвращает 0."""
-        from embedders.ollama import ollama_embedder
-        
         mock_get_embeddings.return_value = []  # Ошибка
         
         repo = MagicMock()
-        repo.delete_chunks_by_hash.return_value = 0
+        repo.delete_chunks_for_file.return_value = (0, 0)
+        repo.get_cached_embeddings.return_value = {}
         
         file = FileSnapshot(hash="test", path="/test.txt", raw_text="")
         chunks = ["Chunk 1"]
@@ -71,3 +158,53 @@ class TestOllamaEmbedder:
         result = ollama_embedder(repo, file, chunks, {})
         
         assert result == 0
+    
+    @patch('embedders.ollama._session.post')
+    def test_embeddings_batch_parses_response(self, mock_post):
+        """Батч-запрос возвращает эмбеддинги из ответа /api/embed."""
+        mock_post.return_value = _embed_response()
+        
+        result = _get_embeddings_batch(["Chunk 1", "Chunk 2"])
+        
+        assert result == _FAKE_EMBEDDINGS
+        assert mock_post.call_args.kwargs['json']['input'] == ["Chunk 1", "Chunk 2"]
+    
+    @patch('embedders.ollama._session.post')
+    def test_embeddings_batch_count_mismatch(self, mock_post):
+        """Число векторов не совпадает с числом текстов — пустой результат."""
+        mock_post.return_value = _embed_response()
+        
+        assert _get_embeddings_batch(["Only one"]) == []
+    
+    @patch('embedders.ollama._embed_supported', True)
+    @patch('embedders.ollama._session.post')
+    def test_embeddings_batch_legacy_fallback(self, mock_post):
+        """Без /api/embed (404) эмбеддинги запрашиваются через /api/embeddings."""
+        legacy_body = json.dumps({"embedding": _FAKE_EMBEDDINGS[0]}).encode()
+        mock_post.side_effect = [
+            _embed_response(404, b""),
+            _embed_response(body=legacy_body),
+            _embed_response(body=legacy_body),
+        ]
+        
+        result = _get_embeddings_batch(["Chunk 1", "Chunk 2"])
+        
+        assert result == [_FAKE_EMBEDDINGS[0], _FAKE_EMBEDDINGS[0]]
+        assert mock_post.call_args.args[0].endswith("/api/embeddings")
+    
+    @patch('embedders.ollama._embed_supported', True)
+    @patch('embedders.ollama._session.post')
+    def test_embeddings_batch_remembers_legacy(self, mock_post):
+        """После 404 следующие батчи не запрашивают /api/embed повторно."""
+        legacy_body = json.dumps({"embedding": _FAKE_EMBEDDINGS[0]}).encode()
+        mock_post.side_effect = [
+            _embed_response(404, b""),
+            _embed_response(body=legacy_body),
+            _embed_response(body=legacy_body),
+        ]
+        
+        _get_embeddings_batch(["Chunk 1"])
+        _get_embeddings_batch(["Chunk 2"])
+        
+        urls = [c.args[0] for c in mock_post.call_args_list]
+        assert [url.endswith("/api/embed") for url in urls] == [True, False, False]
@@ -1,79 +1,125 @@
 """
 Тесты для парсеров.
 """
+import os
+from pathlib import Path
+from unittest import mock
+
 import pytest
 from contracts import FileSnapshot
-from parsers import ParserRegistry, build_parser_registry, TXTParser
+from parsers import TXTParser, WordParser, PDFParser, PowerPointParser, ExcelParser
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """Дублирует файл фикстуры: hardlink без копирования данных, иначе запись байтов."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        dst.write_bytes(Path(src).read_bytes())
+
+
+@pytest.fixture
+def temp_xlsx_file(tmp_path):
+    """Небольшая книга Excel с одним листом."""
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Данные"
+    sheet.append(["Наименование", "Количество", "Цена"])
+    sheet.append(["Кабель", 10, 125.5])
+    sheet.append(["Розетка", 4, 300])
+    path = tmp_path / "source.xlsx"
+    workbook.save(path)
+    return path
 
 
 class TestTXTParser:
     """Тесты TXTParser."""
     
-    def test_parse_utf8_file(self, tmp_path):
+    def test_parse_utf8_file(self, tmp_path, txt_parser):
         """Парсит UTF-8 файл."""
         # Создаём временный файл
         test_file = tmp_path / "test.txt"
         test_file.write_text("Тестовый текст на русском языке", encoding='utf-8')
         
-        parser = TXTParser()
         file = FileSnapshot(hash="test", path=str(test_file))
-        # Подменяем full_path напрямую через __dict__ для теста
-        file.__dict__['_full_path'] = str(test_file)
-        
+
         # Мокаем full_path property
         import unittest.mock as mock
         with mock.patch.object(FileSnapshot, 'full_path', new_callable=mock.PropertyMock) as mock_fp:
             mock_fp.return_value = str(test_file)
-            result = parser.parse(file)
+            result = txt_parser.parse(file)
         
         assert "Тестовый текст" in result
         assert "русском" in result
     
-    def test_parse_nonexistent_file_raises(self):
+    def test_parse_nonexistent_file_raises(self, txt_parser):
         """Несуществующий файл вызывает исключение."""
         import unittest.mock as mock
         
-        parser = TXTParser()
         file = FileSnapshot(hash="test", path="nonexistent.txt")
         
         with mock.patch.object(FileSnapshot, 'full_path', new_callable=mock.PropertyMock) as mock_fp:
             mock_fp.return_value = "/nonexistent_path/nonexistent.txt"
             with pytest.raises(FileNotFoundError):
-                parser.parse(file)
+                txt_parser.parse(file)
 
 
 class TestParserRegistry:
     """Тесты ParserRegistry."""
     
-    def test_get_parser_for_txt(self):
-        """Находит парсер для .txt."""
-        registry = build_parser_registry()
-        parser = registry.get_parser("document.txt")
-        
-        assert parser is not None
-        assert isinstance(parser, TXTParser)
-    
-    def test_get_parser_for_docx(self):
-        """Находит парсер для .docx."""
-        registry = build_parser_registry()
-        parser = registry.get_parser("document.docx")
-        
-        assert parser is not None
-    
-    def test_get_parser_for_unknown_extension(self):
-        """Возвращает None для неизвестного расширения."""
-        registry = build_parser_registry()
-        parser = registry.get_parser("document.xyz")
+    @pytest.mark.parametrize("file_path, parser_cls", [
+        ("document.txt", TXTParser),
+        ("document.docx", WordParser),
+        ("DOCUMENT.DOC", WordParser),
+        ("report.pdf", PDFParser),
+        ("slides.pptx", PowerPointParser),
+        ("table.xls", ExcelParser),
+        ("document.xyz", None),
+    ])
+    def test_get_parser(self, parser_registry, file_path, parser_cls):
+        """Находит парсер по расширению или возвращает None для неизвестного."""
+        parser = parser_registry.get_parser(file_path)
         
-        assert parser is None
+        if parser_cls is None:
+            assert parser is None
+        else:
+            assert isinstance(parser, parser_cls)
     
-    def test_supported_extensions(self):
+    def test_supported_extensions(self, parser_registry):
         """Возвращает список поддерживаемых расширений."""
-        registry = build_parser_registry()
-        extensions = registry.supported_extensions()
+        extensions = parser_registry.supported_extensions()
         
         assert ".txt" in extensions
         assert ".docx" in extensions
         assert ".pdf" in extensions
         assert ".pptx" in extensions
         assert ".xlsx" in extensions
+
+
+class TestExcelParser:
+    """Тесты ExcelParser."""
+    
+    def test_parse_xls_triggers_conversion(self, tmp_path, temp_xlsx_file, excel_parser):
+        """Файл .xls конвертируется в .xlsx перед разбором."""
+        legacy_path = tmp_path / "legacy.xls"
+        _link_or_copy(temp_xlsx_file, legacy_path)
+        
+        # Конвертер кладёт результат во временную папку, которую парсер удаляет
+        converted_dir = tmp_path / "alpaca_xls_convert_test"
+        converted_dir.mkdir()
+        converted_path = converted_dir / "legacy.xlsx"
+        _link_or_copy(temp_xlsx_file, converted_path)
+        
+        file = FileSnapshot(hash="test", path="legacy.xls")
+        with mock.patch.object(FileSnapshot, 'full_path', new_callable=mock.PropertyMock) as mock_fp, \
+                mock.patch('parsers.excel.excel_parser.convert_xls_to_xlsx') as mock_convert:
+            mock_fp.return_value = str(legacy_path)
+            mock_convert.return_value = str(converted_path)
+            result = excel_parser.parse(file)
+        
+        mock_convert.assert_called_once_with(str(legacy_path))
+        assert "## Лист: Данные" in result
+        assert "Кабель" in result
+        assert not converted_dir.exists()
@@ -0,0 +1,363 @@
+"""
+Тесты пайплайна: ограничение параллелизма семафорами и роутинг событий.
+"""
+from concurrent.futures import FIRST_EXCEPTION, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from multiprocessing import get_context
+from threading import Barrier, Lock, Semaphore
+from unittest.mock import MagicMock
+
+import pytest
+from contracts import FileSnapshot
+from parsers import ParserRegistry, parse_in_process
+from pipeline import IngestDocument, ProcessFileEvent
+
+
+# Многопоточные тесты держим вместе на одном воркере xdist
+pytestmark = pytest.mark.xdist_group("pipeline_concurrency")
+
+# Лимиты параллелизма для тестов (больше 1, чтобы проверка была содержательной)
+MAX_PARSE = 2
+MAX_EMBED = 2
+# Кратно лимитам: задачи проходят барьер группами по MAX_* без остатка
+TASKS = 4
+# Результат замоканного парсера строится один раз, а не на каждый вызов
+_PARSED_TEXT = "Parsed text " * 100
+
+
+class PeakCounter:
+    """
+    Счётчик текущих и пиковых входов.
+    
+    Вход и выход под одной блокировкой: текущее значение и пик меняются
+    вместе, более медленный поток не перезапишет пик меньшим значением.
+    """
+    
+    __slots__ = ("_lock", "_current", "_peak")
+    
+    def __init__(self):
+        self._lock = Lock()
+        self._current = 0
+        self._peak = 0
+    
+    def enter(self) -> None:
+        with self._lock:
+            self._current += 1
+            self._peak = max(self._peak, self._current)
+    
+    def exit(self) -> None:
+        with self._lock:
+            self._current -= 1
+    
+    @property
+    def peak(self) -> int:
+        return self._peak
+
+
+class _CustomParser:
+    """Парсер нестандартного расширения для реестра из фабрики."""
+    
+    def parse(self, file: FileSnapshot) -> str:
+        return f"custom {file.path}"
+
+
+def _build_custom_registry() -> ParserRegistry:
+    """Фабрика уровня модуля: процесс spawn импортирует её по имени."""
+    return ParserRegistry({(".custom",): _CustomParser()})
+
+
+class TrackingSemaphore(Semaphore):
+    """Семафор, фиксирующий пиковое число одновременных владельцев."""
+    
+    def __init__(self, value: int = 1):
+        super().__init__(value)
+        self.counter = PeakCounter()
+    
+    def __enter__(self):
+        result = super().__enter__()
+        self.counter.enter()
+        return result
+    
+    def __exit__(self, *exc_info):
+        self.counter.exit()
+        return super().__exit__(*exc_info)
+    
+    @property
+    def peak(self) -> int:
+        return self.counter.peak
+
+
+@pytest.fixture(scope="module")
+def executor():
+    """Общий пул потоков на модуль: потоки не пересоздаются в каждом тесте."""
+    pool = ThreadPoolExecutor(max_workers=TASKS, thread_name_prefix="test-pipeline")
+    yield pool
+    pool.shutdown(wait=True)
+
+
+def _build_pipeline(
+    tmp_path,
+    parse_func,
+    embed_func,
+    parse_semaphore: Semaphore = None,
+    embed_semaphore: Semaphore = None,
+) -> IngestDocument:
+    """Собирает IngestDocument с замоканными компонентами."""
+    parser = MagicMock()
+    parser.parse.side_effect = parse_func
+    parser_registry = MagicMock()
+    parser_registry.get_parser.return_value = parser
+    
+    return IngestDocument(
+        repository=MagicMock(),
+        parser_registry_factory=lambda: parser_registry,
+        chunker=lambda file: ["chunk"],
+        embedder=embed_func,
+        parse_semaphore=parse_semaphore or Semaphore(MAX_PARSE),
+        embed_semaphore=embed_semaphore or Semaphore(MAX_EMBED),
+        llm_semaphore=Semaphore(1),
+        temp_dir=str(tmp_path),
+    )
+
+
+class TestPipelineConcurrency:
+    """Семафоры IngestDocument ограничивают параллельные шаги."""
+    
+    def test_parse_semaphore_limit(self, tmp_path, executor):
+        """Одновременно парсится ровно MAX_PARSE файлов, не больше."""
+        parse_semaphore = TrackingSemaphore(MAX_PARSE)
+        barrier = Barrier(MAX_PARSE, timeout=2.0)
+        
+        def slow_parser(file):
+            barrier.wait()
+            return _PARSED_TEXT
+        
+        pipeline = _build_pipeline(
+            tmp_path, slow_parser, lambda *args: 1, parse_semaphore=parse_semaphore
+        )
+        
+        futures = [
+            executor.submit(pipeline, FileSnapshot(hash=f"hash_{i}", path=f"doc_{i}.docx"))
+            for i in range(TASKS)
+        ]
+        # Первая ошибка в любой задаче всплывает сразу, без ожидания futures[0]
+        done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in done:
+            assert future.result() is True
+        assert not not_done
+        
+        assert parse_semaphore.peak == MAX_PARSE
+    
+    def test_embed_semaphore_limit(self, tmp_path, executor):
+        """Одновременно эмбеддится ровно MAX_EMBED файлов, не больше."""
+        embed_semaphore = TrackingSemaphore(MAX_EMBED)
+        barrier = Barrier(MAX_EMBED, timeout=2.0)
+        
+        def slow_embedder(repo, file, chunks, metadata):
+            barrier.wait()
+            return len(chunks)
+        
+        pipeline = _build_pipeline(
+            tmp_path, lambda file: _PARSED_TEXT, slow_embedder, embed_semaphore=embed_semaphore
+        )
+        
+        futures = [
+            executor.submit(pipeline, FileSnapshot(hash=f"hash_{i}", path=f"doc_{i}.docx"))
+            for i in range(TASKS)
+        ]
+        # Первая ошибка в любой задаче всплывает сразу, без ожидания futures[0]
+        done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in done:
+            assert future.result() is True
+        assert not not_done
+        
+        assert embed_semaphore.peak == MAX_EMBED
+
+
+
+class TestParseExecutor:
+    """Парсинг через пул процессов IngestDocument.parse_executor."""
+    
+    def test_parse_submitted_to_executor(self, tmp_path):
+        """С parse_executor текст берётся из parse_in_process, а не из парсера потока."""
+        future = Future()
+        future.set_result(_PARSED_TEXT)
+        parse_executor = MagicMock()
+        parse_executor.submit.return_value = future
+        
+        pipeline = _build_pipeline(tmp_path, lambda file: "thread text", lambda *args: 1)
+        pipeline.parse_executor = parse_executor
+        file = FileSnapshot(hash="hash_0", path="doc_0.docx")
+        
+        assert pipeline(file) is True
+        parse_executor.submit.assert_called_once_with(
+            parse_in_process, file, pipeline.parser_registry_factory
+        )
+        assert file.raw_text == _PARSED_TEXT
+    
+    def test_process_uses_injected_registry(self, tmp_path):
+        """Процесс-исполнитель парсит реестром из фабрики IngestDocument, а не реестром по умолчанию."""
+        pipeline = IngestDocument(
+            repository=MagicMock(),
+            parser_registry_factory=_build_custom_registry,
+            chunker=lambda file: ["chunk"],
+            embedder=lambda *args: 1,
+            parse_semaphore=Semaphore(1),
+            embed_semaphore=Semaphore(1),
+            llm_semaphore=Semaphore(1),
+            temp_dir=str(tmp_path),
+        )
+        file = FileSnapshot(hash="hash_0", path="doc_0.custom")
+        
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            pipeline.parse_executor = pool
+            assert pipeline(file) is True
+        
+        assert file.raw_text == "custom doc_0.custom"
+
+
+class TestUnchangedText:
+    """Изменённый файл с прежним текстом не проходит чанкинг и эмбеддинг заново."""
+    
+    def test_unchanged_text_keeps_chunks(self, tmp_path):
+        """Текст совпал, свойства файла изменились: чанки остаются, метаданные новые."""
+        embedder = MagicMock()
+        chunker = MagicMock()
+        pipeline = _build_pipeline(tmp_path, lambda file: _PARSED_TEXT, embedder)
+        pipeline.chunker = chunker
+        # Новый mtime файла попадает в метаданные документа
+        pipeline.metaextractor = lambda file: {"modified_at": f"mtime={file.mtime}"}
+        pipeline.repository.replace_raw_text.return_value = False
+        pipeline.repository.retag_chunks.return_value = 3
+        file = FileSnapshot(hash="hash_new", path="doc.docx", status_sync="updated", mtime=2.0)
+        
+        assert pipeline(file) is True
+        pipeline.repository.retag_chunks.assert_called_once_with(
+            "hash_new", "doc.docx", {"modified_at": "mtime=2.0"}
+        )
+        pipeline.repository.mark_as_ok.assert_called_once_with("hash_new")
+        chunker.assert_not_called()
+        embedder.assert_not_called()
+    
+    @pytest.mark.parametrize("status,kept", [("updated", 0), ("added", 3)])
+    def test_full_pipeline_otherwise(self, tmp_path, status, kept):
+        """Без полного набора чанков или для нового файла — полный пайплайн."""
+        embedder = MagicMock(return_value=1)
+        pipeline = _build_pipeline(tmp_path, lambda file: _PARSED_TEXT, embedder)
+        pipeline.repository.replace_raw_text.return_value = False
+        pipeline.repository.retag_chunks.return_value = kept
+        
+        assert pipeline(FileSnapshot(hash="hash_0", path="doc.docx", status_sync=status)) is True
+        embedder.assert_called_once()
+
+
+class TestSaveToDisk:
+    """Отладочная копия распарсенного текста в temp_dir."""
+    
+    def test_directory_created_once(self, tmp_path, monkeypatch):
+        """Каталог создаётся один раз, файлы пишутся каждый раз."""
+        import pipeline.ingest as ingest_module
+        
+        makedirs_calls = []
+        real_makedirs = ingest_module.os.makedirs
+        monkeypatch.setattr(
+            ingest_module.os, "makedirs",
+            lambda path, **kwargs: makedirs_calls.append(path) or real_makedirs(path, **kwargs),
+        )
+        pipeline = _build_pipeline(tmp_path, lambda file: _PARSED_TEXT, lambda *args: 1)
+        
+        for i in range(TASKS):
+            pipeline._save_to_disk(f"docs/doc_{i}.docx", _PARSED_TEXT)
+        
+        assert makedirs_calls == [str(tmp_path / "docs")]
+        assert (tmp_path / "docs" / "doc_0.docx.md").read_text(encoding="utf-8") == _PARSED_TEXT
+        assert len(list((tmp_path / "docs").iterdir())) == TASKS
+    
+    def test_removed_directory_recreated(self, tmp_path):
+        """Каталог, удалённый после создания, создаётся заново при записи."""
+        import shutil
+        
+        pipeline = _build_pipeline(tmp_path, lambda file: _PARSED_TEXT, lambda *args: 1)
+        pipeline._save_to_disk("docs/doc_0.docx", _PARSED_TEXT)
+        shutil.rmtree(tmp_path / "docs")
+        
+        pipeline._save_to_disk("docs/doc_1.docx", _PARSED_TEXT)
+        
+        assert (tmp_path / "docs" / "doc_1.docx.md").read_text(encoding="utf-8") == _PARSED_TEXT
+    
+    def test_saved_in_background_before_cleaning(self, tmp_path):
+        """С save_executor пишется распарсенный текст, а не результат cleaner'а."""
+        pipeline = _build_pipeline(tmp_path, lambda file: _PARSED_TEXT, lambda *args: 1)
+        pipeline.keep_parsed_md = True
+        pipeline.cleaner = lambda text: "cleaned"
+        
+        with ThreadPoolExecutor(max_workers=1) as save_executor:
+            pipeline.save_executor = save_executor
+            assert pipeline(FileSnapshot(hash="hash_0", path="doc_0.docx")) is True
+        
+        assert (tmp_path / "doc_0.docx.md").read_text(encoding="utf-8") == _PARSED_TEXT
+    
+    def test_disabled(self, tmp_path):
+        """При keep_parsed_md=False на диск ничего не пишется."""
+        pipeline = _build_pipeline(tmp_path, lambda file: _PARSED_TEXT, lambda *args: 1)
+        pipeline.keep_parsed_md = False
+        
+        assert pipeline(FileSnapshot(hash="hash_0", path="doc_0.docx")) is True
+        assert not list(tmp_path.iterdir())
+
+
+def _assert_called_once_if(mock: MagicMock, expected: bool, *args) -> None:
+    """Ровно один вызов (с args, если заданы) или ни одного."""
+    if not expected:
+        mock.assert_not_called()
+    elif args:
+        mock.assert_called_once_with(*args)
+    else:
+        mock.assert_called_once()
+
+
+class TestProcessFileEvent:
+    """Роутинг ProcessFileEvent по статусу файла."""
+    
+    @pytest.mark.parametrize(
+        "status,expected,should_ingest,should_delete_chunks,should_delete_file",
+        [
+            ("added", True, True, False, False),
+            ("updated", True, True, False, False),
+            ("deleted", True, False, False, True),
+            ("unknown", False, False, False, False),
+        ],
+    )
+    def test_process_file(
+        self, status, expected, should_ingest, should_delete_chunks, should_delete_file
+    ):
+        """Каждый статус вызывает только свои шаги."""
+        ingest_document = MagicMock(return_value=True)
+        repository = MagicMock()
+        repository.delete_chunks_for_file.return_value = (0, 0)
+        repository.delete_file_and_chunks.return_value = (0, 0)
+        process = ProcessFileEvent(ingest_document=ingest_document, repository=repository)
+        
+        file_info = {"hash": f"hash_{status}", "path": "f.docx", "status_sync": status}
+        
+        assert process(file_info) is expected
+        _assert_called_once_if(ingest_document, should_ingest)
+        _assert_called_once_if(
+            repository.delete_chunks_for_file, should_delete_chunks, f"hash_{status}", "f.docx"
+        )
+        _assert_called_once_if(
+            repository.delete_file_and_chunks, should_delete_file, f"hash_{status}", "f.docx"
+        )
+        repository.delete_file_by_hash.assert_not_called()
+        repository.mark_as_error.assert_not_called()
+    
+    def test_failed_update_removes_old_chunks(self):
+        """Если новая версия не проиндексирована, чанки прежней удаляются."""
+        ingest_document = MagicMock(return_value=False)
+        repository = MagicMock()
+        repository.delete_chunks_for_file.return_value = (0, 3)
+        process = ProcessFileEvent(ingest_document=ingest_document, repository=repository)
+        
+        file_info = {"hash": "hash_new", "path": "f.docx", "status_sync": "updated"}
+        
+        assert process(file_info) is False
+        repository.delete_chunks_for_file.assert_called_once_with("hash_new", "f.docx")
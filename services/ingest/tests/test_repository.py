@@ -0,0 +1,250 @@
+"""
+Тесты для IngestRepository (без подключения к БД).
+"""
+import csv
+import json
+from unittest.mock import MagicMock, call
+
+import numpy as np
+
+from contracts import SyncStatus
+from repository import IngestRepository, _to_jsonb, _to_vector_literal, _to_vector_literals
+
+
+class TestVectorLiteral:
+    """Тесты сериализации эмбеддинга в литерал pgvector."""
+    
+    def test_matches_join_format(self):
+        """Литерал совпадает с прежним форматом "[a,b,c]"."""
+        embedding = [0.1, -2.5, 3.0, 1e-07]
+        
+        assert _to_vector_literal(embedding) == "[" + ",".join(map(str, embedding)) + "]"
+    
+    def test_empty_vector(self):
+        """Пустой вектор даёт "[]"."""
+        assert _to_vector_literal([]) == "[]"
+
+
+class TestVectorLiterals:
+    """Тесты пакетной сериализации эмбеддингов через NumPy."""
+    
+    def test_roundtrip_float32(self):
+        """Литералы без потерь восстанавливают float32 исходных эмбеддингов."""
+        embeddings = np.random.default_rng(0).standard_normal((3, 1024)).tolist()
+        
+        literals = _to_vector_literals(embeddings)
+        
+        assert len(literals) == 3
+        for literal, embedding in zip(literals, embeddings):
+            assert literal.startswith("[") and literal.endswith("]")
+            restored = np.asarray(json.loads(literal), dtype=np.float32)
+            assert np.array_equal(restored, np.asarray(embedding, dtype=np.float32))
+    
+    def test_ragged_falls_back(self):
+        """Эмбеддинги разной длины сериализуются по одному."""
+        embeddings = [[0.5, 1.0], [2.0]]
+        
+        assert _to_vector_literals(embeddings) == [_to_vector_literal(e) for e in embeddings]
+    
+    def test_empty_batch(self):
+        """Пустая пачка даёт пустой список."""
+        assert _to_vector_literals([]) == []
+
+
+class TestJsonbMetadata:
+    """Тесты адаптера метаданных чанка."""
+    
+    def test_cyrillic_not_escaped(self):
+        """Кириллица передаётся как есть, без \\uXXXX, и читается обратно."""
+        metadata = {"title": "Договор поставки", "chunk_index": 3}
+        
+        dumped = _to_jsonb(metadata).dumps(metadata)
+        
+        assert "Договор поставки" in dumped
+        assert json.loads(dumped) == metadata
+
+
+class TestPreparedStatements:
+    """Тесты PREPARE/EXECUTE горячих запросов."""
+    
+    def test_prepare_once_per_connection(self):
+        """PREPARE выполняется один раз на соединение, далее только EXECUTE."""
+        repo = IngestRepository(database_url="postgresql://test")
+        conn, cur = MagicMock(), MagicMock()
+        
+        repo._execute_prepared(conn, cur, "ingest_delete_file", ("hash_1",))
+        repo._execute_prepared(conn, cur, "ingest_delete_file", ("hash_2",))
+        
+        prepares = [c for c in cur.execute.call_args_list if c.args[0].startswith("PREPARE")]
+        assert len(prepares) == 1
+        assert cur.execute.call_args == call("EXECUTE ingest_delete_file(%s)", ("hash_2",))
+        
+        # Новое соединение пула готовит запрос заново
+        other_cur = MagicMock()
+        repo._execute_prepared(MagicMock(), other_cur, "ingest_delete_file", ("hash_3",))
+        assert other_cur.execute.call_args_list[0].args[0].startswith("PREPARE ingest_delete_file AS")
+
+
+class TestSession:
+    """Тесты session(): одно соединение на серию операций."""
+    
+    def test_one_connection_and_batched_commits(self):
+        """Операции сессии идут через одно соединение, COMMIT раз в commit_every."""
+        repo = IngestRepository(database_url="postgresql://test")
+        pool = MagicMock()
+        conn = pool.getconn.return_value
+        conn.closed = 0
+        conn.cursor.return_value.__enter__.return_value.rowcount = 1
+        repo._pool = pool
+        
+        with repo.session(commit_every=2):
+            for file_hash in ("h1", "h2", "h3"):
+                assert repo.mark_as_processed(file_hash)
+            assert conn.commit.call_count == 1
+        
+        pool.getconn.assert_called_once()
+        assert conn.commit.call_count == 2
+        pool.putconn.assert_called_once_with(conn, close=False)
+        
+        # После выхода из сессии методы снова берут соединение из пула
+        repo.mark_as_ok("h1")
+        assert pool.getconn.call_count == 2
+
+
+class TestMarkManyAs:
+    """Тесты пакетного обновления статусов."""
+    
+    def test_single_update_for_batch(self):
+        """Пачка хэшей обновляется одним EXECUTE с массивом."""
+        repo = IngestRepository(database_url="postgresql://test")
+        conn = MagicMock()
+        cur = conn.cursor.return_value.__enter__.return_value
+        cur.rowcount = 3
+        repo.get_connection = MagicMock()
+        repo.get_connection.return_value.__enter__.return_value = conn
+        
+        assert repo.mark_many_as(SyncStatus.OK, ("h1", "h2", "h3")) == 3
+        assert cur.execute.call_args == call(
+            "EXECUTE ingest_update_status_many(%s, %s)", ("ok", ["h1", "h2", "h3"])
+        )
+    
+    def test_empty_batch_skips_db(self):
+        """Пустая пачка не обращается к БД."""
+        repo = IngestRepository(database_url="postgresql://test")
+        repo.get_connection = MagicMock()
+        
+        assert repo.mark_many_as(SyncStatus.OK, []) == 0
+        repo.get_connection.assert_not_called()
+
+
+class TestRetagChunks:
+    """Тесты перепривязки чанков файла с неизменённым текстом."""
+    
+    def test_new_metadata_replaces_shared_keys(self):
+        """В запрос уходят новые метаданные документа вместе с хэшем и путём."""
+        repo = IngestRepository(database_url="postgresql://test")
+        conn = MagicMock()
+        cur = conn.cursor.return_value.__enter__.return_value
+        cur.rowcount = 2
+        repo.get_connection = MagicMock()
+        repo.get_connection.return_value.__enter__.return_value = conn
+        
+        assert repo.retag_chunks("hash_new", "doc.docx", {"modified_at": "2024-05-01"}) == 2
+        
+        sql, (file_path, metadata) = cur.execute.call_args.args
+        assert sql == "EXECUTE ingest_retag_chunks(%s, %s)"
+        assert file_path == "doc.docx"
+        assert json.loads(metadata) == {
+            "modified_at": "2024-05-01", "file_hash": "hash_new", "file_path": "doc.docx"
+        }
+        assert "chunk_index" in repo._statements["ingest_retag_chunks"]
+
+
+class TestEmbeddingIndex:
+    """Тесты восстановления HNSW-индекса эмбеддингов."""
+    
+    def _repo(self, index_exists: bool):
+        repo = IngestRepository(database_url="postgresql://test", chunks_table="chunks_test")
+        conn = MagicMock()
+        cur = conn.cursor.return_value.__enter__.return_value
+        cur.fetchone.return_value = (index_exists,)
+        repo.get_connection = MagicMock()
+        repo.get_connection.return_value.__enter__.return_value = conn
+        return repo, cur
+    
+    def test_existing_index_untouched(self):
+        """Индекс на месте — CREATE INDEX не выполняется."""
+        repo, cur = self._repo(index_exists=True)
+        
+        assert repo.ensure_embedding_index() is False
+        cur.execute.assert_called_once_with(
+            "SELECT to_regclass(%s) IS NOT NULL", ("idx_chunks_test_embedding",)
+        )
+    
+    def test_missing_index_rebuilt(self):
+        """Индекса нет (прерванная первичная загрузка) — он строится для своей таблицы."""
+        repo, cur = self._repo(index_exists=False)
+        
+        assert repo.ensure_embedding_index() is True
+        statements = [c.args[0] for c in cur.execute.call_args_list]
+        create = next(sql for sql in statements if "CREATE INDEX" in sql)
+        assert "idx_chunks_test_embedding" in create
+        assert "ON chunks_test" in create
+
+
+class TestSaveChunksCopy:
+    """Тесты пакетной вставки чанков через COPY."""
+    
+    def test_rows_streamed_as_csv(self):
+        """Все строки уходят одним COPY; кавычки, переводы строк и "" сохраняются."""
+        repo = IngestRepository(database_url="postgresql://test")
+        conn = MagicMock()
+        cur = conn.cursor.return_value.__enter__.return_value
+        payload = []
+        cur.copy_expert.side_effect = lambda sql, buffer: payload.append(buffer.read())
+        repo.get_connection = MagicMock()
+        repo.get_connection.return_value.__enter__.return_value = conn
+        rows = [
+            ('Текст "в кавычках",\nс переносом', {"title": "Договор"}, [0.5, 1.0]),
+            ("", {"chunk_index": 1}, [2.0, -0.25]),
+        ]
+        
+        assert repo.save_chunks(rows) == 2
+        
+        cur.copy_expert.assert_called_once()
+        assert "FORMAT csv" in cur.copy_expert.call_args.args[0]
+        parsed = list(csv.reader(payload[0].splitlines(keepends=True)))
+        assert [(content, json.loads(metadata), json.loads(vector)) for content, metadata, vector in parsed] == rows
+    
+    def test_shared_metadata_merged_into_rows(self):
+        """Общие метаданные попадают в каждую строку, ключи строки важнее."""
+        repo = IngestRepository(database_url="postgresql://test")
+        conn = MagicMock()
+        cur = conn.cursor.return_value.__enter__.return_value
+        payload = []
+        cur.copy_expert.side_effect = lambda sql, buffer: payload.append(buffer.read())
+        repo.get_connection = MagicMock()
+        repo.get_connection.return_value.__enter__.return_value = conn
+        rows = [
+            ("a", {"chunk_index": 0}, [0.5]),
+            ("b", {}, [1.0]),
+            ("c", {"title": "Своё"}, [2.0]),
+        ]
+        
+        assert repo.save_chunks(rows, shared_metadata={"title": "Договор", "file_hash": "h"}) == 3
+        
+        parsed = list(csv.reader(payload[0].splitlines(keepends=True)))
+        # json.loads, как и JSONB, оставляет последний из повторяющихся ключей
+        assert [json.loads(metadata) for _, metadata, _ in parsed] == [
+            {"title": "Договор", "file_hash": "h", "chunk_index": 0},
+            {"title": "Договор", "file_hash": "h"},
+            {"title": "Своё", "file_hash": "h"},
+        ]
+    
+    def test_empty_rows_skip_db(self):
+        """Пустая пачка не обращается к БД."""
+        repo = IngestRepository(database_url="postgresql://test")
+        repo.get_connection = MagicMock()
+        
+        assert repo.save_chunks([]) == 0
+        repo.get_connection.assert_not_called()
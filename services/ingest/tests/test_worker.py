@@ -0,0 +1,97 @@
+"""
+Тесты Worker: ограничение числа параллельных задач.
+"""
+from itertools import islice
+from threading import Barrier, Lock
+from unittest.mock import MagicMock
+
+import pytest
+
+from worker import Worker
+
+
+# Многопоточные тесты держим вместе на одном воркере xdist
+pytestmark = pytest.mark.xdist_group("worker_concurrency")
+
+MAX_WORKERS = 3
+# Кратно MAX_WORKERS: задачи проходят барьер группами без остатка
+TASKS = 6
+
+
+class TestWorkerConcurrency:
+    """Worker не запускает больше max_workers задач одновременно."""
+    
+    def test_threadpool_max_workers_limit(self):
+        """Одновременно выполняется ровно MAX_WORKERS задач."""
+        lock = Lock()
+        current = [0]
+        peak = [0]
+        barrier = Barrier(MAX_WORKERS, timeout=2.0)
+        
+        def process_file(file_info):
+            with lock:
+                current[0] += 1
+                peak[0] = max(peak[0], current[0])
+            barrier.wait()
+            with lock:
+                current[0] -= 1
+            return True
+        
+        files = [{"hash": f"hash_{i}", "path": f"doc_{i}.docx"} for i in range(TASKS)]
+        
+        def next_files(count, wait=0):
+            # Выдаём TASKS файлов, затем останавливаем цикл worker'а
+            if not files:
+                raise KeyboardInterrupt
+            batch = files[:count]
+            del files[:count]
+            return batch
+        
+        worker = Worker(
+            repository=MagicMock(),
+            filewatcher_api_url="http://filewatcher",
+            process_file_func=process_file,
+        )
+        worker._get_next_files = next_files
+        
+        worker.start(poll_interval=0, max_workers=MAX_WORKERS)
+        
+        assert peak[0] == MAX_WORKERS
+        # /api/next-files уже пометил файлы processed
+        worker.repository.mark_many_as.assert_not_called()
+    
+    def test_stop_when_idle(self):
+        """stop_when_idle: worker завершается, когда очередь разобрана."""
+        files = iter([{"hash": f"hash_{i}", "path": f"doc_{i}.docx"} for i in range(TASKS)])
+        
+        worker = Worker(
+            repository=MagicMock(),
+            filewatcher_api_url="http://filewatcher",
+            process_file_func=lambda file_info: True,
+        )
+        worker._get_next_files = lambda count, wait=0: list(islice(files, count))
+        
+        worker.start(poll_interval=0, max_workers=MAX_WORKERS, stop_when_idle=True)
+        
+        assert worker.processed_count == TASKS
+    
+    def test_fallback_marks_processed(self):
+        """Старый FileWatcher без /api/next-files: worker помечает файлы сам."""
+        files = iter([{"hash": f"hash_{i}", "path": f"doc_{i}.docx"} for i in range(TASKS)])
+        
+        worker = Worker(
+            repository=MagicMock(),
+            filewatcher_api_url="http://filewatcher",
+            process_file_func=lambda file_info: True,
+        )
+        worker._batch_supported = False
+        worker._get_next_files = lambda count, wait=0: list(islice(files, count))
+        
+        worker.start(poll_interval=0, max_workers=MAX_WORKERS, stop_when_idle=True)
+        
+        marked = [
+            file_hash
+            for c in worker.repository.mark_many_as.call_args_list
+            for file_hash in c.args[1]
+        ]
+        assert marked == [f"hash_{i}" for i in range(TASKS)]
@@ -9,6 +9,7 @@ Model Context Protocol (MCP) сервер предоставляет инстр
     uvicorn main:app --host 0.0.0.0 --port 8000
 """
 
+import asyncio
 import os
 from typing import List, Dict, Any, Optional
 from contextlib import asynccontextmanager
@@ -222,12 +223,15 @@ async def get_document_info(file_path: str):
     logger.info(f"📄 Document info: {file_path}")
     
     repository = get_repository()
-    chunks = repository.get_chunks_by_file_path(file_path)
+    # psycopg2 блокирующий — запрос в потоке, event loop не ждёт БД
+    preview, total_chunks = await asyncio.to_thread(
+        repository.get_document_preview, file_path, 5
+    )
     
-    if not chunks:
+    if not total_chunks:
         return {"error": f"Document not found: {file_path}"}
     
-    first_chunk = chunks[0]
+    first_chunk = preview[0]
     metadata = first_chunk.get("metadata", {})
     
     return {
@@ -236,13 +240,13 @@ async def get_document_info(file_path: str):
         "title": metadata.get("title"),
         "summary": metadata.get("summary"),
         "category": metadata.get("category"),
-        "total_chunks": len(chunks),
+        "total_chunks": total_chunks,
         "chunks_preview": [
             {
                 "chunk_index": c.get("metadata", {}).get("chunk_index", i),
                 "content_preview": c.get("content", "")[:200] + "..."
             }
-            for i, c in enumerate(chunks[:5])
+            for i, c in enumerate(preview)
         ]
     }
 
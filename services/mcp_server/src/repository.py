@@ -2,35 +2,60 @@
 Repository для MCP Server — работа с PostgreSQL + pgvector.
 """
 
-from typing import List, Dict, Any
+import json
+from typing import List, Dict, Any, Optional, Tuple
 from contextlib import contextmanager
+from threading import Lock
 
-import psycopg2
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 
 from logging_config import get_logger
 
 logger = get_logger("mcp_server.repository")
 
+# Вектор запроса search_similar -> "[a,b,c]" для %s::halfvec
+_VECTOR_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
 
 class MCPRepository:
     """Репозиторий для работы с чанками документов."""
     
-    def __init__(self, database_url: str):
+    def __init__(self, database_url: str, pool_maxconn: int = 5):
         self.database_url = database_url
+        self.pool_maxconn = pool_maxconn
+        
+        # Пул соединений: поиск не открывает новое подключение на каждый вызов
+        self._pool: Optional[ThreadedConnectionPool] = None
+        self._pool_lock = Lock()
+    
+    def _get_pool(self) -> ThreadedConnectionPool:
+        """Ленивая инициализация пула соединений."""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadedConnectionPool(
+                        minconn=1,
+                        maxconn=self.pool_maxconn,
+                        dsn=self.database_url
+                    )
+        return self._pool
     
     @contextmanager
     def get_connection(self):
-        """Context manager для соединения с БД."""
-        conn = psycopg2.connect(self.database_url)
+        """Context manager для соединения из пула."""
+        pool = self._get_pool()
+        conn = pool.getconn()
         try:
             yield conn
             conn.commit()
         except Exception:
-            conn.rollback()
+            if not conn.closed:
+                conn.rollback()
             raise
         finally:
-            conn.close()
+            # close=True: пул откроет новое соединение вместо упавшего
+            pool.putconn(conn, close=bool(conn.closed))
     
     def search_similar(
         self,
@@ -43,16 +68,16 @@ class MCPRepository:
         
         Использует cosine distance через pgvector.
         """
-        embedding_str = "[" + ",".join(map(str, embedding)) + "]"
+        embedding_str = _VECTOR_ENCODER.encode(embedding)
         
         query = """
             SELECT 
                 content,
                 metadata,
-                1 - (embedding <=> %s::vector) as similarity
+                1 - (embedding <=> %s::halfvec) as similarity
             FROM chunks
-            WHERE 1 - (embedding <=> %s::vector) >= %s
-            ORDER BY embedding <=> %s::vector
+            WHERE 1 - (embedding <=> %s::halfvec) >= %s
+            ORDER BY embedding <=> %s::halfvec
             LIMIT %s
         """
         
@@ -71,24 +96,38 @@ class MCPRepository:
         
         return results
     
-    def get_chunks_by_file_path(self, file_path: str) -> List[Dict[str, Any]]:
-        """Получить все чанки документа по пути."""
+    def get_document_preview(
+        self,
+        file_path: str,
+        limit: int = 5
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Первые limit чанков документа (по chunk_index) и общее число его чанков.
+        
+        COUNT(*) OVER () считается до LIMIT: превью и число чанков — одним
+        запросом, остальные чанки из БД не передаются.
+        
+        Returns:
+            (чанки превью, всего чанков); ([], 0) если документа нет
+        """
         query = """
-            SELECT content, metadata
+            SELECT content, metadata, COUNT(*) OVER () AS total_chunks
             FROM chunks
             WHERE metadata->>'file_path' = %s
             ORDER BY (metadata->>'chunk_index')::int
+            LIMIT %s
         """
         
         with self.get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(query, (file_path,))
+                cur.execute(query, (file_path, limit))
                 rows = cur.fetchall()
         
-        return [
-            {"content": row["content"], "metadata": row["metadata"] or {}}
-            for row in rows
-        ]
+        if not rows:
+            return [], 0
+        
+        preview = [{"content": row["content"], "metadata": row["metadata"] or {}} for row in rows]
+        return preview, rows[0]["total_chunks"]
     
     def count_chunks(self) -> int:
         """Количество чанков в БД."""
@@ -47,5 +47,5 @@ class VectorSearcher:
             threshold=threshold
         )
         
-        logger.debug(f"Search '{query[:30]}...' → {len(chunks)} results")
+        logger.debug("Search '%s...' → %s results", query[:30], len(chunks))
         return chunks